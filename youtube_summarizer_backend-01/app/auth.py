@@ -1,28 +1,26 @@
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
 import os
 
 from app.userRepository import models, schema
+from app.userRepository.password_hasher import ahash_password, averify_password
 from app import database
+from app.auth_cache import decode_token, principal_cache
+
+logger = logging.getLogger(__name__)
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="signin")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
@@ -30,43 +28,83 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_user_by_username(db: Session, username: str):
-    return db.query(models.User).filter(models.User.username == username).first()
+async def get_user_by_username(db: AsyncSession, username: str):
+    result = await db.execute(select(models.User).where(models.User.username == username).limit(1))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: EmailStr):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: EmailStr):
+    result = await db.execute(select(models.User).where(models.User.email == email).limit(1))
+    return result.scalars().first()
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
+    if not user:
+        return False
+    verified, new_hash = await averify_password(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Upgrade the stored hash to the current bcrypt cost
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(database.get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token, SECRET_KEY, [ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user_by_username(db, username=username)
+    user = await get_principal(db, username)
     if user is None:
         raise credentials_exception
-    print(f'User: {user.name}')
+    logger.debug("User: %s", user.username)
     return user
 
-def create_user(db: Session, user: schema.UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def get_principal(db: AsyncSession, username: str) -> schema.UserOut | None:
+    """
+    User for a token subject, from principal_cache when it was looked up
+    in the last PRINCIPAL_CACHE_TTL_SECONDS.
+    """
+    principal = principal_cache.get(username)
+    if principal is None:
+        user = await get_user_by_username(db, username=username)
+        if user is None:
+            return None
+        principal = schema.UserOut.model_validate(user, from_attributes=True)
+        principal_cache.set(username, principal)
+    return principal
+
+async def get_current_user_id(request: Request, db: AsyncSession = Depends(database.get_async_db)) -> int:
+    """
+    Id of the user authenticated by JWTAuthenticationMiddleware.
+
+    Reads the "uid" claim, falling back to a username lookup for tokens
+    issued before the claim was added.
+    """
+    payload = getattr(request.state, "user", None) or {}
+    user_id = payload.get("uid")
+    if user_id is None:
+        username = payload.get("sub")
+        user = await get_principal(db, username) if username else None
+        if user is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+        user_id = user.id
+    return user_id
+
+async def create_user(db: AsyncSession, user: schema.UserCreate):
+    hashed_password = await ahash_password(user.password)
     db_user = models.User(
         name=user.name, username=user.username, email=user.email, hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from jose import jwt
+
+from app.summaryRepository.summary_cache import LRUCache
+
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "1000"))
+# Short, so profile changes show up without an explicit invalidation
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+
+class CountingCache:
+    """
+    LRUCache wrapper that counts hits and misses.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self._stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        with self._stats_lock:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        self.memory.set(key, value, expires_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters, hit rate and cache size.
+        """
+        with self._stats_lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+                "size": len(self.memory)
+            }
+
+
+# Verified JWT payloads by token hash, each kept until the token's exp
+token_cache = CountingCache(TOKEN_CACHE_MAX_ENTRIES, ttl_seconds=0)
+# Users by username, for handlers that need more than the token claims
+principal_cache = CountingCache(PRINCIPAL_CACHE_MAX_ENTRIES, PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+def decode_token(token: str, secret_key: str, algorithms: list[str]) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its payload, from token_cache when it was
+    verified before.
+
+    Only tokens with an exp claim are cached, and only until they expire,
+    so a cached payload is never accepted past the point jwt.decode would
+    reject it.
+
+    Args:
+        token: Encoded JWT
+        secret_key: Signing key
+        algorithms: Accepted signing algorithms
+
+    Returns:
+        Dict[str, Any]: Decoded payload
+
+    Raises:
+        JWTError: If the token is invalid or expired
+    """
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, secret_key, algorithms=algorithms)
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)) and expires_at > time.time():
+        token_cache.set(key, payload, float(expires_at))
+    return payload
@@ -0,0 +1,31 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability import collect_stage_timings
+
+
+class ServerTimingMiddleware:
+    """
+    Collect pipeline stage timings per request, report them in a
+    Server-Timing response header and export them to /metrics.
+
+    The header is written when the response starts, so streamed responses
+    only include the stages that finished before their first byte; their
+    histograms still get every stage once the stream ends.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_stage_timings() as timings:
+            async def send_with_timing(message: Message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
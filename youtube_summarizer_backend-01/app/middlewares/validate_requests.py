@@ -1,7 +1,11 @@
 from fastapi import Request, HTTPException
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
-from jose import jwt, JWTError
+from starlette.types import ASGIApp, Receive, Scope, Send
+from jose import JWTError
+
+from app.auth_cache import decode_token
 
 class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, secret_key: str, algorithms: list[str]):
@@ -18,7 +22,7 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
             token = authorization.split(" ")[1]
             try:
                 # Decode and validate the JWT token
-                payload = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+                payload = decode_token(token, self.secret_key, self.algorithms)
                 request.state.user = payload  # Attach the decoded payload to the request state
             except JWTError:
                 raise HTTPException(status_code=401, detail="Invalid token")
@@ -30,4 +34,44 @@ class JWTAuthenticationMiddleware(BaseHTTPMiddleware):
             return JSONResponse(
                 status_code=exc.status_code,
                 content={"detail": exc.detail},
-            )
\ No newline at end of file
+            )
+
+class JWTAuthenticationASGIMiddleware:
+    """
+    Pure ASGI version of JWTAuthenticationMiddleware.
+
+    Same checks and 401 bodies, but the request goes straight to the wrapped
+    app instead of through BaseHTTPMiddleware's extra task and memory
+    stream, so streaming responses and background tasks are untouched.
+    """
+
+    def __init__(self, app: ASGIApp, secret_key: str, algorithms: list[str]):
+        self.app = app
+        self.secret_key = secret_key
+        self.algorithms = algorithms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get("Authorization")
+        if not authorization or not authorization.startswith("Bearer "):
+            await self._unauthorized("Missing or invalid Authorization header")(scope, receive, send)
+            return
+
+        token = authorization.split(" ")[1]
+        try:
+            # Decode and validate the JWT token
+            payload = decode_token(token, self.secret_key, self.algorithms)
+        except JWTError:
+            await self._unauthorized("Invalid token")(scope, receive, send)
+            return
+
+        # request.state is backed by scope["state"]
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _unauthorized(detail: str) -> JSONResponse:
+        return JSONResponse(status_code=401, content={"detail": detail})
@@ -0,0 +1,224 @@
+import contextvars
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+from prometheus_client import REGISTRY, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Share of hot-path records (logged with extra=SAMPLED) that are kept;
+# warnings and errors are always kept
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+SAMPLED = {"sampled": True}
+
+# Stage latencies range from sub-millisecond cache reads to minute-long reduces
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "summary_stage_seconds",
+    "Time spent in each summary pipeline stage",
+    ["stage", "format_type", "chunks", "source"],
+    buckets=STAGE_BUCKETS
+)
+
+UNLABELLED = "none"
+# format_type label values; anything else is exported as "other"
+FORMAT_LABELS = ("paragraph", "bullet", "detailed")
+# Libraries that log every request at INFO
+QUIET_LOGGERS = ("httpx", "httpcore")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep LOG_SAMPLE_RATE of the records marked with extra=SAMPLED.
+    """
+
+    def __init__(self, rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < self.rate
+
+
+def configure_logging() -> None:
+    """
+    Send app logs to stderr at LOG_LEVEL, sampling hot-path records.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(SamplingFilter())
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(LOG_LEVEL)
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def format_label(format_type: Union[str, List[str]]) -> str:
+    """
+    Requested format(s) as a label value: a known format, "multi" for
+    several formats at once, or "other", so client input can't add series.
+    """
+    format_types = [format_type] if isinstance(format_type, str) else list(format_type)
+    if len(format_types) > 1:
+        return "multi" if all(f in FORMAT_LABELS for f in format_types) else "other"
+    if format_types and format_types[0] in FORMAT_LABELS:
+        return format_types[0]
+    return "other"
+
+
+def chunk_bucket(chunk_count: Optional[int]) -> str:
+    """
+    Chunk count as a small set of label values, to keep metric cardinality bounded.
+    """
+    if chunk_count is None:
+        return UNLABELLED
+    for upper, label in ((1, "1"), (4, "2-4"), (16, "5-16"), (64, "17-64")):
+        if chunk_count <= upper:
+            return label
+    return "65+"
+
+
+class StageTimings:
+    """
+    Stage durations collected while handling one request or job.
+
+    Durations are kept until the request finishes, since the labels (format,
+    chunk count, transcript source) are only known once the pipeline ran.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+        self.labels = {"format_type": UNLABELLED, "chunks": UNLABELLED, "source": UNLABELLED}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages.setdefault(stage, []).append(seconds)
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: total time per stage (with the call
+        count for repeated stages like map) and the elapsed total.
+        """
+        entries = []
+        for stage, durations in self.stages.items():
+            entry = f"{stage};dur={sum(durations) * 1000:.1f}"
+            if len(durations) > 1:
+                entry += f';desc="{len(durations)} calls"'
+            entries.append(entry)
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+    def observe(self) -> None:
+        for stage, durations in self.stages.items():
+            histogram = STAGE_SECONDS.labels(stage=stage, **self.labels)
+            for seconds in durations:
+                histogram.observe(seconds)
+
+
+_stage_timings: contextvars.ContextVar[Optional[StageTimings]] = contextvars.ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect_stage_timings() -> Iterator[StageTimings]:
+    """
+    Collect the stage timings recorded in this context (and the tasks it
+    starts), then export them to the stage histogram.
+    """
+    timings = StageTimings()
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+        timings.observe()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Record a stage duration for the current request, or straight into the
+    histogram (unlabelled) when there is none.
+    """
+    timings = _stage_timings.get()
+    if timings is None:
+        STAGE_SECONDS.labels(stage=stage, format_type=UNLABELLED, chunks=UNLABELLED, source=UNLABELLED).observe(seconds)
+    else:
+        timings.add(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a pipeline stage.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def set_stage_labels(
+        format_type: Optional[Union[str, List[str]]] = None,
+        chunk_count: Optional[int] = None,
+        source: Optional[str] = None
+) -> None:
+    """
+    Set the labels the current request's stage timings are exported with.
+    """
+    timings = _stage_timings.get()
+    if timings is None:
+        return
+    if format_type is not None:
+        timings.labels["format_type"] = format_label(format_type)
+    if chunk_count is not None:
+        timings.labels["chunks"] = chunk_bucket(chunk_count)
+    if source is not None:
+        timings.labels["source"] = source
+
+
+class AppStatsCollector:
+    """
+    Exports the in-process cache, summarizer registry and single-flight
+    counters as gauges at scrape time.
+    """
+
+    def describe(self):
+        # Keeps registration from calling collect() during import
+        return []
+
+    def collect(self):
+        # Imported here so that modules using stage() can import this one
+        from app.auth_cache import token_cache, principal_cache
+        from app.summaryRepository.single_flight import summary_flight
+        from app.summaryRepository.summarizer_registry import get_registry_stats
+        from app.summaryRepository.summary_cache import summary_cache, map_cache, chapter_cache
+
+        caches = GaugeMetricFamily("app_cache_stat", "In-process cache counters and sizes", labels=["cache", "stat"])
+        for name, cache in (("summary", summary_cache), ("map", map_cache), ("chapter", chapter_cache),
+                            ("token", token_cache), ("principal", principal_cache)):
+            for stat, value in cache.stats().items():
+                caches.add_metric([name, stat], value)
+        yield caches
+
+        registry = GaugeMetricFamily("summarizer_registry_stat", "Summarizer registry counters", labels=["stat"])
+        for stat, value in get_registry_stats().items():
+            registry.add_metric([stat], value)
+        yield registry
+
+        flights = GaugeMetricFamily("single_flight_stat", "Summary single-flight counters", labels=["stat"])
+        for stat, value in summary_flight.stats().items():
+            flights.add_metric([stat], value)
+        yield flights
+
+
+REGISTRY.register(AppStatsCollector())
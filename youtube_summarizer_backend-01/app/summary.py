@@ -1,108 +1,251 @@
-from fastapi import Depends, HTTPException, APIRouter
+import json
+import logging
+from typing import Optional
+
+from fastapi import Depends, HTTPException, APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import database
+from app.auth import get_current_user_id
+from app.observability import SAMPLED, stage
 from app.summaryRepository.models import SummaryResponse, VideoRequest, SummarySaveResponse, SummarySaveRequest, \
-    SummaryHistoryResponse
-from app.summaryRepository.repository import save_summary, get_histories, get_history_by_id
-from app.summaryRepository.youtube_transcript_v2 import get_youtube_transcript_v2, get_video_info_ytdlp
-from app.summaryRepository.summarize_transcript import summarize_transcript
+    SummaryHistoryResponse, SummaryJobResponse, BatchVideoRequest, SummarySearchResponse
+from app.summaryRepository.repository import save_summary, get_histories, get_history_by_id, create_job, get_job, \
+    job_format_type, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE, HISTORY_PREVIEW_CHARS
+from app.summaryRepository.search import search_summaries, SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE
+from app.summaryRepository.pipeline import summarize_video, stream_summary_video, stream_batch_summaries, \
+    format_type_list
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Dependency Injection Example
 def validate_url(url: str):
-    if not (url.startswith("https://www.youtube.com") or url.startswith("https://youtu.be")):
-        raise HTTPException(status_code=400, detail="Invalid YouTube URL")
+    with stage("validate"):
+        if not (url.startswith("https://www.youtube.com") or url.startswith("https://youtu.be")):
+            raise HTTPException(status_code=400, detail="Invalid YouTube URL")
     return url
 
 
 @router.post("/youtube", response_model=SummaryResponse)
-def generate_youtube_summary(
+async def generate_youtube_summary(
     video_request: VideoRequest,
 ):
     try:
         # Call your summarizer function here
         url = validate_url(video_request.url)
-        print(f'Received request: {url}')
-        
-        # Get video information (title, etc.)
-        video_info = get_video_info_ytdlp(url)
-        video_title = video_info.get('title', 'YouTube Video')
-        
-        # Get transcript using the improved method
-        transcript = get_youtube_transcript_v2(youtube_url=url)
-        
-        # Generate summary with format type from request
-        summary_result = summarize_transcript(
-            transcript=transcript, 
-            max_tokens=video_request.max_length,
-            format_type=video_request.format_type
-        )
-        summary = summary_result["summary"]
+        logger.info("Received request: %s", url, extra=SAMPLED)
 
-        return SummaryResponse(
-            url=url,
-            title=video_title,
-            summary=summary,
-            word_count=len(summary.split())
+        return await summarize_video(
+            url, video_request.format_type, video_request.max_length, chapters=video_request.chapters
         )
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Error summarizing %s", video_request.url)
         raise HTTPException(status_code=500, detail=f"Error summarizing video: {str(e)}")
 
 
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/youtube/stream")
+async def stream_youtube_summary(
+    video_request: VideoRequest,
+):
+    """
+    Server-Sent Events variant of /youtube: progress events, then the summary
+    tokens as they are generated, then a final "summary" event shaped like
+    SummaryResponse.
+    """
+    url = validate_url(video_request.url)
+    format_types = format_type_list(video_request.format_type)
+    if len(format_types) != 1:
+        raise HTTPException(status_code=400, detail="Streaming supports exactly one format_type")
+    logger.info("Received streaming request: %s", url, extra=SAMPLED)
+
+    async def events():
+        async for event, data in stream_summary_video(
+            url, format_types[0], video_request.max_length, video_request.chapters
+        ):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/batch")
+async def stream_batch_summary(
+    batch_request: BatchVideoRequest,
+):
+    """
+    Summarize a list of videos and/or a playlist as Server-Sent Events:
+    a "batch" event with the de-duplicated video list, a "video" event per
+    video as it finishes, then "done".
+    """
+    urls = [validate_url(url) for url in batch_request.urls]
+    playlist_url = validate_url(batch_request.playlist_url) if batch_request.playlist_url else None
+    if not urls and not playlist_url:
+        raise HTTPException(status_code=400, detail="Provide urls or playlist_url")
+    logger.info("Received batch request: %d URLs, playlist: %s", len(urls), playlist_url)
+
+    async def events():
+        async for event, data in stream_batch_summaries(
+            urls, playlist_url, batch_request.format_type, batch_request.max_length
+        ):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def to_job_response(job) -> SummaryJobResponse:
+    return SummaryJobResponse(
+        id=job.id,
+        status=job.status,
+        url=job.url,
+        format_type=job_format_type(job),
+        max_length=job.max_length,
+        chapters=bool(job.chapters),
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+        createdAt=job.createdAt,
+        startedAt=job.startedAt,
+        finishedAt=job.finishedAt
+    )
+
+
+@router.post("/jobs", response_model=SummaryJobResponse, status_code=202)
+def create_summary_job(
+    video_request: VideoRequest,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Queue a summary for the background worker (see worker.py) and return
+    the job right away. Poll GET /jobs/{job_id} for the result.
+    """
+    url = validate_url(video_request.url)
+    job = create_job(db, url, video_request.format_type, video_request.max_length, video_request.chapters)
+    logger.info("Queued summary job %s for %s", job.id, url)
+    return to_job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=SummaryJobResponse)
+def get_summary_job(job_id: str, db: Session = Depends(database.get_db)):
+    job = get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return to_job_response(job)
+
+
 @router.post("/save", response_model=SummarySaveResponse)
-def save_summary_history(
+async def save_summary_history(
     summary_request: SummarySaveRequest,
-    db: Session = Depends(database.get_db)
+    owner_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(database.get_async_db)
 ):
-    # Placeholder for actual implementation
-    # Save the summary to a database or file
-    print(f"Saving summary for URL: {summary_request.url}")
-    saved_summary = save_summary(db, {
-        "title": summary_request.title,
-        "summary": summary_request.summary,
-        "metadata": {
-            "url": summary_request.url
-        }
-    })
+    with stage("db_save"):
+        await save_summary(db, {
+            "title": summary_request.title,
+            "summary": summary_request.summary,
+            "metadata": {
+                "url": summary_request.url
+            }
+        }, owner_id)
+    logger.info("Saved summary for %s", summary_request.url, extra=SAMPLED)
     return SummarySaveResponse(
         message=f"Summary saved for {summary_request.url}"
     )
 
 
 @router.get("/history", response_model=SummaryHistoryResponse)
-def get_saved_histories(db: Session = Depends(database.get_db)):
-    # Placeholder for actual implementation
-    summaries = get_histories(db)
-    mapped_summaries = list(map(lambda x: {
+async def get_saved_histories(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    preview: bool = False,
+    owner_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    One page of the current user's saved summaries, newest first. Pass the
+    returned next_cursor to get the following page; preview=true returns
+    summary snippets instead of full bodies.
+    """
+    try:
+        summaries, next_cursor = await get_histories(
+            db, owner_id, limit, cursor, preview_chars=HISTORY_PREVIEW_CHARS if preview else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    mapped_summaries = [{
         "id": x.id,
         "title": x.title,
-        "url": x.summary_metadata.url,
+        "url": x.url,
         "summary": x.summary,
-        "createdAt": x.summary_metadata.createdAt.strftime("%Y-%m-%d %H:%M:%S")
-    }, summaries))
+        "createdAt": x.createdAt.strftime("%Y-%m-%d %H:%M:%S")
+    } for x in summaries]
 
-    print(f"Retrieved summaries: {mapped_summaries[0]['summary']} - {mapped_summaries[0]['title']} - {mapped_summaries[0]['url']}")
+    logger.debug("Retrieved %d summaries", len(mapped_summaries))
     return SummaryHistoryResponse(
-        histories=mapped_summaries
+        histories=mapped_summaries,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/search", response_model=SummarySearchResponse)
+async def search_saved_summaries(
+    q: str,
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=SEARCH_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    owner_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    """
+    Full-text search over the current user's saved summaries, best match
+    first, with highlighted snippets. Pass next_offset as offset for the
+    following page.
+    """
+    try:
+        results, next_offset = await search_summaries(db, owner_id, q, limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for result in results:
+        result["createdAt"] = result["createdAt"].strftime("%Y-%m-%d %H:%M:%S")
+    logger.debug("Found %d summaries", len(results))
+    return SummarySearchResponse(
+        results=results,
+        next_offset=next_offset
     )
 
 
 @router.get("/history/{history_id}", response_model=SummaryHistoryResponse)
-def get_summary_by_id(history_id: int, db: Session = Depends(database.get_db)):
-    print(f'Retrieving summary with ID: {history_id}')
-    summaries = get_history_by_id(db, history_id)
+async def get_summary_by_id(
+    history_id: int,
+    owner_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    summaries = await get_history_by_id(db, history_id, owner_id)
+    if not summaries:
+        raise HTTPException(status_code=404, detail="Summary not found")
     mapped_summaries = list(map(lambda x: {
         "id": x.id,
         "title": x.title,
-        "url": x.summary_metadata.value,
+        "url": x.summary_metadata.url,
         "summary": x.summary,
         "createdAt": x.summary_metadata.createdAt.strftime("%Y-%m-%d %H:%M:%S")
     }, summaries))
 
-    print(f"Retrieved summaries: {mapped_summaries[0]['summary']} - {mapped_summaries[0]['title']} - {mapped_summaries[0]['url']}")
+    logger.debug("Retrieved summary %d", history_id)
     return SummaryHistoryResponse(
         histories=mapped_summaries
     )
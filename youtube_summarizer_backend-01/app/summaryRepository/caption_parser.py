@@ -0,0 +1,271 @@
+import html
+import json
+import re
+import xml.etree.ElementTree as ET
+from array import array
+from collections import deque
+from io import StringIO
+from typing import Any, Iterable, List, Optional, Union
+
+# Inline markup in caption text: <c>, <i>, <c.colorE5E5E5>, <00:00:01.234>, ...
+_TAG = re.compile(r"<[^>]*>")
+_WHITESPACE = re.compile(r"\s+")
+
+# How many recently emitted lines a new line is compared against
+DEDUP_WINDOW = 3
+
+CAPTION_FORMATS = ("vtt", "srv3", "json3")
+
+
+class Captions:
+    """
+    Parsed caption lines with cue timings kept in compact arrays.
+
+    texts holds the de-duplicated caption lines; starts and ends hold each
+    line's cue timing in seconds as array('d') (8 bytes per value) when
+    timings are kept, and stay empty otherwise.
+    """
+
+    __slots__ = ("texts", "starts", "ends", "keep_timings")
+
+    def __init__(self, keep_timings: bool = True):
+        self.texts: List[str] = []
+        self.starts = array("d")
+        self.ends = array("d")
+        self.keep_timings = keep_timings
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def text(self) -> str:
+        return " ".join(self.texts)
+
+    def cues(self) -> List[List[Any]]:
+        """
+        Cues as [start, end, text] triples (empty if timings were not kept).
+        """
+        if not self.keep_timings:
+            return []
+        return [[start, end, text] for start, end, text in zip(self.starts, self.ends, self.texts)]
+
+
+class _CaptionBuilder:
+    """
+    Appends cleaned lines to Captions, dropping rolling-caption repeats.
+
+    Auto-generated captions repeat the previous line at the top of each cue
+    and reveal lines word by word, so a line is dropped if it equals one of
+    the last DEDUP_WINDOW lines, and replaces the previous line if it just
+    extends it. Each check is constant work per line, keeping parsing linear.
+    """
+
+    def __init__(self, keep_timings: bool):
+        self.captions = Captions(keep_timings)
+        self.recent = deque(maxlen=DEDUP_WINDOW)
+
+    def add(self, raw: str, start: float, end: float) -> None:
+        line = clean_caption_text(raw)
+        if not line or line in self.recent:
+            return
+
+        captions = self.captions
+        if captions.texts and line.startswith(captions.texts[-1] + " "):
+            # Growing line (whole words only, so "so" is not merged into
+            # "some"): keep the original start, extend the end
+            captions.texts[-1] = line
+            if captions.keep_timings:
+                captions.ends[-1] = end
+        else:
+            captions.texts.append(line)
+            if captions.keep_timings:
+                captions.starts.append(start)
+                captions.ends.append(end)
+        self.recent.append(line)
+
+
+def clean_caption_text(raw: str) -> str:
+    """
+    Strip inline markup and timing tags, unescape entities and collapse whitespace.
+    """
+    if "<" in raw:
+        raw = _TAG.sub("", raw)
+    if "&" in raw:
+        raw = html.unescape(raw)
+    return _WHITESPACE.sub(" ", raw).strip()
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """
+    Convert a VTT timestamp (HH:MM:SS.mmm or MM:SS.mmm) to seconds.
+    """
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_vtt(lines: Union[str, Iterable[str]], keep_timings: bool = True) -> Captions:
+    """
+    Parse WebVTT captions in a single pass.
+
+    Args:
+        lines: VTT document text, or an iterable of lines such as an open file
+        keep_timings: Keep cue start/end times
+
+    Returns:
+        Captions: De-duplicated caption lines
+    """
+    if isinstance(lines, str):
+        lines = StringIO(lines)
+
+    builder = _CaptionBuilder(keep_timings)
+    in_header = True
+    in_cue = False
+    skipping_block = False
+    start = end = 0.0
+
+    for line in lines:
+        # Only a truly empty line ends a block; auto-captions use " " as cue text
+        if not line.rstrip("\r\n"):
+            in_header = in_cue = skipping_block = False
+            continue
+        if in_header or skipping_block:
+            continue
+        line = line.strip().lstrip("\ufeff")
+
+        if "-->" in line:
+            start_text, _, rest = line.partition("-->")
+            try:
+                start = parse_timestamp(start_text.strip())
+                end = parse_timestamp(rest.split(None, 1)[0])
+            except (ValueError, IndexError):
+                pass
+            in_cue = True
+            continue
+
+        if in_cue:
+            builder.add(line, start, end)
+        elif line.startswith(("NOTE", "STYLE", "REGION")):
+            skipping_block = True
+        # Anything else outside a cue is a cue identifier
+
+    return builder.captions
+
+
+def parse_srv3(content: Union[str, bytes], keep_timings: bool = True) -> Captions:
+    """
+    Parse YouTube timed-text XML captions.
+
+    Handles srv3 (<p t="ms" d="ms"> with <s> word segments) as well as the
+    older srv1 layout (<text start="s" dur="s">).
+
+    Args:
+        content: XML document
+        keep_timings: Keep cue start/end times
+
+    Returns:
+        Captions: De-duplicated caption lines
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    builder = _CaptionBuilder(keep_timings)
+    for _, element in ET.iterparse(_BytesLines(content), events=("end",)):
+        if element.tag == "p":
+            start = float(element.get("t", 0)) / 1000
+            end = start + float(element.get("d", 0)) / 1000
+        elif element.tag == "text":
+            start = float(element.get("start", 0))
+            end = start + float(element.get("dur", 0))
+        else:
+            continue
+        builder.add("".join(element.itertext()), start, end)
+        element.clear()
+
+    return builder.captions
+
+
+def parse_json3(content: Union[str, bytes, dict], keep_timings: bool = True) -> Captions:
+    """
+    Parse YouTube json3 captions.
+
+    Args:
+        content: JSON document, or the already decoded dict
+        keep_timings: Keep cue start/end times
+
+    Returns:
+        Captions: De-duplicated caption lines
+    """
+    data = json.loads(content) if isinstance(content, (str, bytes)) else content
+
+    builder = _CaptionBuilder(keep_timings)
+    for event in data.get("events") or []:
+        segments = event.get("segs")
+        if not segments:
+            continue
+        start = event.get("tStartMs", 0) / 1000
+        end = start + event.get("dDurationMs", 0) / 1000
+        builder.add("".join(segment.get("utf8", "") for segment in segments), start, end)
+
+    return builder.captions
+
+
+def detect_caption_format(content: Union[str, bytes]) -> Optional[str]:
+    """
+    Guess the caption format from the start of the document.
+    """
+    head = content[:64].decode("utf-8", "ignore") if isinstance(content, bytes) else content[:64]
+    head = head.lstrip("\ufeff \r\n\t")
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if head.startswith("<"):
+        return "srv3"
+    if head.startswith("{"):
+        return "json3"
+    return None
+
+
+def parse_captions(content: Union[str, bytes], caption_format: Optional[str] = None,
+                   keep_timings: bool = True) -> Captions:
+    """
+    Parse captions in any supported format.
+
+    Args:
+        content: Caption document
+        caption_format: "vtt", "srv3" (or "srv1"/"srv2"/"xml") or "json3";
+            detected from the content when omitted
+        keep_timings: Keep cue start/end times
+
+    Returns:
+        Captions: De-duplicated caption lines
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    caption_format = caption_format or detect_caption_format(content)
+    if caption_format == "vtt":
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        return parse_vtt(content, keep_timings)
+    if caption_format in ("srv1", "srv2", "srv3", "xml", "ttml"):
+        return parse_srv3(content, keep_timings)
+    if caption_format == "json3":
+        return parse_json3(content, keep_timings)
+    raise ValueError(f"Unsupported caption format: {caption_format}")
+
+
+class _BytesLines:
+    """
+    Minimal file-like wrapper so iterparse can stream from a bytes buffer.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            size = len(self.data) - self.position
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return bytes(chunk)
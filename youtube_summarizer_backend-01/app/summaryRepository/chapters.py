@@ -0,0 +1,140 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from app.summaryRepository.summarize_transcript import PROMPT_VERSION
+from app.summaryRepository.summarizer_registry import aget_summarizer
+from app.summaryRepository.summary_cache import chapter_cache, make_chapter_key
+
+
+def format_timestamp(seconds: float) -> str:
+    """
+    Format seconds as H:MM:SS, or M:SS under an hour.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def split_chapters(cues: List[List[Any]], chapters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Cut timed transcript cues at chapter boundaries.
+
+    Each cue goes to the chapter its start time falls in. Chapters without
+    any caption text are dropped.
+
+    Args:
+        cues: [start, end, text] cues in time order
+        chapters: yt-dlp chapter markers ('start_time', 'end_time', 'title')
+
+    Returns:
+        List[Dict[str, Any]]: 'title', 'start', 'end' and 'text' per chapter,
+        or an empty list if there are fewer than two chapters with text
+    """
+    if not cues or len(chapters) < 2:
+        return []
+
+    chapters = sorted(chapters, key=lambda chapter: chapter.get('start_time') or 0)
+    sections = []
+    index = 0
+    for position, chapter in enumerate(chapters):
+        start = chapter.get('start_time') or 0
+        is_last = position == len(chapters) - 1
+        end = chapter.get('end_time') or (cues[-1][1] if is_last else chapters[position + 1].get('start_time'))
+
+        lines = []
+        while index < len(cues) and (is_last or cues[index][0] < end):
+            lines.append(cues[index][2])
+            index += 1
+        if lines:
+            sections.append({
+                'title': chapter.get('title') or f"Chapter {position + 1}",
+                'start': start,
+                'end': end,
+                'text': ' '.join(lines),
+            })
+
+    return sections if len(sections) >= 2 else []
+
+
+async def asummarize_chapters(
+        sections: List[Dict[str, Any]],
+        format_type: str = "paragraph",
+        max_tokens: int = 1000,
+        model: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Summarize a video chapter by chapter, then combine the chapter summaries.
+
+    Chapter summaries are format-independent key points cached per chapter,
+    so a later request in another format only runs the combine step.
+    Uncached chapters are summarized in parallel.
+
+    Args:
+        sections: Chapters from split_chapters
+        format_type: Format type ("paragraph", "bullet", or "detailed")
+        max_tokens: Maximum tokens for each summary
+        model: Model name to use
+
+    Returns:
+        Dict[str, Any]: Dictionary with summary, metadata and timestamped 'sections'
+    """
+    return (await asummarize_chapters_formats(sections, [format_type], max_tokens, model))[format_type]
+
+
+async def asummarize_chapters_formats(
+        sections: List[Dict[str, Any]],
+        format_types: List[str],
+        max_tokens: int = 1000,
+        model: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Version of asummarize_chapters for several formats: the chapter
+    summaries are shared and the combine calls run concurrently.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Summary dictionary per format type
+    """
+    summarizer = await aget_summarizer(model=model, max_tokens=max_tokens)
+
+    keys = [make_chapter_key(section['text'], max_tokens, summarizer.model, PROMPT_VERSION) for section in sections]
+    cached = await asyncio.gather(*(chapter_cache.aget(key) for key in keys))
+    missing = [i for i, entry in enumerate(cached) if entry is None]
+
+    chapter_summaries = [entry['summary'] if entry else None for entry in cached]
+    if missing:
+        new_summaries = await summarizer.asummarize_sections([sections[i]['text'] for i in missing])
+        for i, summary in zip(missing, new_summaries):
+            chapter_summaries[i] = summary
+        await asyncio.gather(*(
+            chapter_cache.aset(keys[i], {"summary": summary}) for i, summary in zip(missing, new_summaries)
+        ))
+
+    labelled = [
+        f"{section['title']} ({format_timestamp(section['start'])})\n{summary}"
+        for section, summary in zip(sections, chapter_summaries)
+    ]
+    final_summaries, reduce_levels = await summarizer.acombine_formats(labelled, format_types)
+
+    timestamped_sections = [
+        {
+            "title": section['title'],
+            "start": section['start'],
+            "end": section['end'],
+            "timestamp": format_timestamp(section['start']),
+            "summary": summary,
+        }
+        for section, summary in zip(sections, chapter_summaries)
+    ]
+    return {
+        format_type: {
+            "summary": final_summary,
+            "word_count": len(final_summary.split()),
+            "format": format_type,
+            "chunk_count": len(sections),
+            "direct": False,
+            "reduce_levels": reduce_levels,
+            "cached_chapters": len(sections) - len(missing),
+            "sections": timestamped_sections,
+        }
+        for format_type, final_summary in final_summaries.items()
+    }
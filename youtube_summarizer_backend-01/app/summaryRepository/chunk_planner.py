@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+from typing import Dict, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# Context window (input + output tokens) per model
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-3.5-turbo": 16385,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Upper bound on a single map chunk; map outputs are capped at max_tokens,
+# so larger chunks would be compressed too aggressively
+SUMMARY_MAX_CHUNK_TOKENS = int(os.getenv("SUMMARY_MAX_CHUNK_TOKENS", "3000"))
+# Smallest map chunk worth a call; output budgets that leave less are rejected
+# instead of fanning a transcript out into thousands of tiny map calls
+SUMMARY_MIN_CHUNK_TOKENS = int(os.getenv("SUMMARY_MIN_CHUNK_TOKENS", "500"))
+# Headroom for chat formatting and tokenizer differences
+CONTEXT_SAFETY_MARGIN = int(os.getenv("SUMMARY_CONTEXT_SAFETY_MARGIN", "256"))
+
+_encodings: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+class ChunkPlan(NamedTuple):
+    direct: bool
+    transcript_tokens: int
+    chunk_tokens: int
+    overlap_tokens: int
+
+
+def get_context_window(model: str) -> int:
+    """
+    Get the context window for a model, matching dated variants by prefix.
+    """
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+    for name in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_WINDOWS[name]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _get_encoding(model: str):
+    with _lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning("tiktoken encoding unavailable, estimating token counts: %s", e)
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """
+    Count tokens in text with the model's tiktoken encoding.
+
+    Falls back to a four-characters-per-token estimate if the encoding
+    cannot be loaded (e.g. no network access to fetch it).
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def input_token_budget(model: str, max_output_tokens: int, prompt_tokens: int) -> int:
+    """
+    Tokens of content that fit in one call next to the prompt and the output.
+    """
+    return max(1, get_context_window(model) - max_output_tokens - prompt_tokens - CONTEXT_SAFETY_MARGIN)
+
+
+def plan_chunks(
+        transcript_tokens: int,
+        model: str,
+        max_output_tokens: int,
+        direct_prompt_tokens: int,
+        map_prompt_tokens: int
+) -> ChunkPlan:
+    """
+    Decide whether a transcript fits one formatted-summary call, and if not,
+    how large each map chunk should be.
+
+    Args:
+        transcript_tokens: Token count of the transcript
+        model: Model name
+        max_output_tokens: Output budget of each call
+        direct_prompt_tokens: Token count of the direct prompt without the transcript
+        map_prompt_tokens: Token count of the map prompt without the chunk
+
+    Returns:
+        ChunkPlan: direct flag plus chunk and overlap sizes in tokens
+
+    Raises:
+        ValueError: If the output budget leaves less than SUMMARY_MIN_CHUNK_TOKENS per chunk
+    """
+    chunk_tokens = min(SUMMARY_MAX_CHUNK_TOKENS, input_token_budget(model, max_output_tokens, map_prompt_tokens))
+    if chunk_tokens < SUMMARY_MIN_CHUNK_TOKENS:
+        raise ValueError(
+            f"max_length {max_output_tokens} leaves only {chunk_tokens} tokens per chunk on {model} "
+            f"(minimum {SUMMARY_MIN_CHUNK_TOKENS})"
+        )
+    overlap_tokens = min(200, chunk_tokens // 20)
+    direct = transcript_tokens <= input_token_budget(model, max_output_tokens, direct_prompt_tokens)
+    return ChunkPlan(direct, transcript_tokens, chunk_tokens, overlap_tokens)
@@ -1,16 +1,42 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, Text, Index, event, func, \
+    inspect, select, update
 from sqlalchemy.orm import relationship
 from app.database import Base
-from pydantic import BaseModel
-from typing import Any
+from app.userRepository import models as user_models  # noqa: F401 - registers "users" for the owner foreign key
+from pydantic import BaseModel, Field, conlist
+from typing import Any, Literal, Optional, Union
+
+# Upper bound on max_length; it is the output budget of every LLM call and
+# leaves room for reasonably sized map chunks on every supported model
+MAX_SUMMARY_LENGTH = 4000
+DEFAULT_SUMMARY_LENGTH = 300
+
+FormatType = Literal["paragraph", "bullet", "detailed"]
+
 
 # Request/Response Models
 class VideoRequest(BaseModel):
     url: str
-    max_length: int = 300
-    format_type: str = "paragraph"  # "paragraph", "bullet", or "detailed"
+    max_length: int = Field(DEFAULT_SUMMARY_LENGTH, gt=0, le=MAX_SUMMARY_LENGTH)
+    format_type: Union[FormatType, conlist(FormatType, min_length=1)] = "paragraph"  # One format or a list of them
+    chapters: bool = False  # Summarize chapter by chapter when the video has chapters
+
+
+class BatchVideoRequest(BaseModel):
+    urls: list[str] = []
+    playlist_url: Optional[str] = None
+    max_length: int = Field(DEFAULT_SUMMARY_LENGTH, gt=0, le=MAX_SUMMARY_LENGTH)
+    format_type: FormatType = "paragraph"
+
+
+class SummarySection(BaseModel):
+    title: str
+    start: float
+    end: float
+    timestamp: str
+    summary: str
 
 
 class SummaryResponse(BaseModel):
@@ -18,6 +44,22 @@ class SummaryResponse(BaseModel):
     title: str
     summary: str
     word_count: int
+    sections: Optional[list[SummarySection]] = None
+    summaries: Optional[dict[str, str]] = None  # Summary per format when several were requested
+
+
+class SummaryJobResponse(BaseModel):
+    id: str
+    status: str  # "queued", "running", "succeeded" or "failed"
+    url: str
+    format_type: Union[str, list[str]]
+    max_length: int
+    chapters: bool = False
+    result: Optional[SummaryResponse] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
 
 
 class SummarySaveRequest(BaseModel):
@@ -31,19 +73,193 @@ class SummarySaveResponse(BaseModel):
 
 class SummaryHistoryResponse(BaseModel):
     histories: list[dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class SummarySearchResponse(BaseModel):
+    results: list[dict[str, Any]]
+    next_offset: Optional[int] = None
 
 class SummaryMetadata(Base):
     __tablename__ = "metadata"
+    __table_args__ = (
+        # Serves each user's history pages: owner filter plus (createdAt, id) keyset order
+        Index("ix_metadata_owner_id_createdAt", "owner_id", "createdAt", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, index=True)
     createdAt = Column(DateTime, default=datetime.now, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id"))
 
 class Summary(Base):
     __tablename__ = "summaries"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    summary = Column(String, index=True)
+    # Searched through the full-text index below, not a B-tree
+    summary = Column(String)
     summary_metadata_id = Column(Integer, ForeignKey("metadata.id"))
     summary_metadata = relationship("SummaryMetadata")
+
+
+# Full-text index over summary titles and bodies, kept outside the ORM model
+# because it is dialect-specific: a generated tsvector column with a GIN index
+# on PostgreSQL, an external-content FTS5 table kept in sync by triggers on SQLite.
+SEARCH_INDEX_DDL = {
+    "postgresql": [
+        # B-tree the summary column used to have
+        "DROP INDEX IF EXISTS ix_summaries_summary",
+        """
+        ALTER TABLE summaries ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(summary, '')), 'B')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_summaries_search_vector ON summaries USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        "DROP INDEX IF EXISTS ix_summaries_summary",
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS summaries_fts USING fts5(
+            title, summary, content='summaries', content_rowid='id'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS summaries_fts_insert AFTER INSERT ON summaries BEGIN
+            INSERT INTO summaries_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS summaries_fts_delete AFTER DELETE ON summaries BEGIN
+            INSERT INTO summaries_fts(summaries_fts, rowid, title, summary)
+            VALUES ('delete', old.id, old.title, old.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS summaries_fts_update AFTER UPDATE ON summaries BEGIN
+            INSERT INTO summaries_fts(summaries_fts, rowid, title, summary)
+            VALUES ('delete', old.id, old.title, old.summary);
+            INSERT INTO summaries_fts(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+        END
+        """,
+        # Index rows that existed before the index did
+        "INSERT INTO summaries_fts(summaries_fts) VALUES ('rebuild')",
+    ],
+}
+
+
+def create_search_index(target, connection, **kw) -> None:
+    """
+    Create the full-text index for the connection's dialect. Idempotent, so
+    it can also be run against databases created before the index existed.
+    """
+    for statement in SEARCH_INDEX_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+event.listen(Summary.__table__, "after_create", create_search_index)
+
+
+def add_column(table: str, column: str, ddl: str):
+    """
+    Migration step adding a column to an existing table unless it is
+    already there. ddl is the column type and constraints, written so that
+    it is valid on both PostgreSQL and SQLite.
+    """
+    def step(connection) -> None:
+        if column not in {c["name"] for c in inspect(connection).get_columns(table)}:
+            # Quoted, so camelCase names keep their case on PostgreSQL
+            name = connection.dialect.identifier_preparer.quote(column)
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+    step.__name__ = f"add_column_{table}_{column}"
+    return step
+
+
+def search_index(connection) -> None:
+    create_search_index(Summary.__table__, connection)
+
+
+def history_index(connection) -> None:
+    for index in SummaryMetadata.__table__.indexes:
+        if index.name == "ix_metadata_owner_id_createdAt":
+            index.create(connection, checkfirst=True)
+
+
+# Schema changes for databases created by an older version. create_all only
+# creates missing tables, so columns and indexes added to existing tables are
+# applied here, in order. Every step must be idempotent: they all run on each
+# manage.py init-db.
+SCHEMA_MIGRATIONS = [
+    search_index,
+    # Per-user history; rows saved before it have no owner, see count_ownerless_summaries
+    add_column("metadata", "owner_id", "INTEGER REFERENCES users(id)"),
+    history_index,
+    add_column("summary_jobs", "chapters", "BOOLEAN DEFAULT FALSE"),
+    add_column("summary_jobs", "notBefore", "TIMESTAMP"),
+]
+
+
+def migrate_schema(connection) -> list:
+    """
+    Run every schema migration step on the connection.
+
+    Returns:
+        list: Names of the steps that were run
+    """
+    for step in SCHEMA_MIGRATIONS:
+        step(connection)
+    return [step.__name__ for step in SCHEMA_MIGRATIONS]
+
+
+def count_ownerless_summaries(connection) -> int:
+    """
+    Count saved summaries without an owner. They were saved before history
+    became per-user and are not shown to anyone until they are assigned
+    with manage.py assign-owner.
+    """
+    table = SummaryMetadata.__table__
+    return connection.execute(
+        select(func.count()).select_from(table).where(table.c.owner_id.is_(None))
+    ).scalar_one()
+
+
+def assign_ownerless_summaries(connection, owner_id: int) -> int:
+    """
+    Give every summary without an owner to the user with owner_id.
+
+    Returns:
+        int: Number of summaries assigned
+    """
+    table = SummaryMetadata.__table__
+    return connection.execute(
+        update(table).where(table.c.owner_id.is_(None)).values(owner_id=owner_id)
+    ).rowcount
+
+
+class CacheEntry(Base):
+    __tablename__ = "cache_entries"
+
+    key = Column(String, primary_key=True)
+    namespace = Column(String, index=True)
+    value = Column(Text)
+    createdAt = Column(DateTime, default=datetime.now, index=True)
+    expiresAt = Column(DateTime, index=True)
+
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+
+    id = Column(String, primary_key=True)
+    url = Column(String)
+    format_type = Column(String)
+    max_length = Column(Integer)
+    chapters = Column(Boolean, default=False)
+    status = Column(String, index=True)
+    attempts = Column(Integer, default=0)
+    result = Column(Text)
+    error = Column(Text)
+    createdAt = Column(DateTime, default=datetime.now, index=True)
+    startedAt = Column(DateTime)
+    finishedAt = Column(DateTime)
+    # Earliest time a job queued again for retry may be claimed
+    notBefore = Column(DateTime)
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import os
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from app.observability import set_stage_labels
+from app.summaryRepository.chapters import split_chapters, asummarize_chapters, asummarize_chapters_formats
+from app.summaryRepository.models import SummaryResponse
+from app.summaryRepository.single_flight import summary_flight
+from app.summaryRepository.summarize_transcript import asummarize_transcript_formats, resolve_model, PROMPT_VERSION
+from app.summaryRepository.summarizer_registry import aget_summarizer
+from app.summaryRepository.summary_cache import summary_cache, make_summary_key
+from app.summaryRepository.youtube_extractor import aget_video_with_transcript, astream_video_with_transcript, \
+    aexpand_playlist
+from app.summaryRepository.youtube_transcript_v2 import extract_video_id
+
+logger = logging.getLogger(__name__)
+
+# Shared by every batch request in the process, so bulk jobs can't starve
+# single-video traffic no matter how many batches run at once
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "4"))
+BATCH_SUMMARIZE_CONCURRENCY = int(os.getenv("BATCH_SUMMARIZE_CONCURRENCY", "4"))
+BATCH_MAX_VIDEOS = int(os.getenv("BATCH_MAX_VIDEOS", "100"))
+
+batch_fetch_limit = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+batch_summarize_limit = asyncio.Semaphore(BATCH_SUMMARIZE_CONCURRENCY)
+
+
+def summary_cache_key(url: str, format_type: str, max_length: int, chapters: bool = False) -> str:
+    """
+    Build the cache/single-flight key for a video URL and summary options.
+    """
+    return make_summary_key(
+        extract_video_id(url),
+        format_type,
+        max_length,
+        resolve_model("openai"),
+        PROMPT_VERSION,
+        chapters
+    )
+
+
+def format_type_list(format_type: Union[str, List[str]]) -> List[str]:
+    """
+    Normalize a format_type option to a list of distinct formats, in order.
+
+    Raises:
+        ValueError: If no format is given
+    """
+    format_types = [format_type] if isinstance(format_type, str) else list(dict.fromkeys(format_type))
+    if not format_types:
+        raise ValueError("At least one format_type is required")
+    return format_types
+
+
+async def summarize_video(
+        url: str,
+        format_type: Union[str, List[str]] = "paragraph",
+        max_length: int = 300,
+        fetch_limit: Optional[asyncio.Semaphore] = None,
+        summarize_limit: Optional[asyncio.Semaphore] = None,
+        chapters: bool = False
+) -> SummaryResponse:
+    """
+    Summarize a YouTube video, serving repeats from the result cache and
+    coalescing concurrent requests for the same video and options.
+
+    Several formats can be requested at once: the video is fetched and
+    mapped once, and only the formats missing from the cache are combined,
+    concurrently. Each format is cached on its own.
+
+    Args:
+        url: Validated YouTube URL
+        format_type: Format type ("paragraph", "bullet", or "detailed"), or a list of them
+        max_length: Maximum tokens for the summary
+        fetch_limit: Optional semaphore held while fetching the video
+        summarize_limit: Optional semaphore held while summarizing
+        chapters: Summarize chapter by chapter, with timestamped sections,
+            when the video has chapters
+
+    Returns:
+        SummaryResponse: The summary in the first format, plus every
+        format in 'summaries' when a list was requested
+    """
+    format_types = format_type_list(format_type)
+    cache_keys = {fmt: summary_cache_key(url, fmt, max_length, chapters) for fmt in format_types}
+
+    # Serve repeats of the same video and options from the result cache
+    cached = await asyncio.gather(*(summary_cache.aget(cache_keys[fmt]) for fmt in format_types))
+    results: Dict[str, Dict[str, Any]] = {fmt: entry for fmt, entry in zip(format_types, cached) if entry is not None}
+
+    missing = [fmt for fmt in format_types if fmt not in results]
+    if missing:
+        # Concurrent requests for the same video and options share one pipeline run
+        responses = await summary_flight.ado(
+            "|".join(cache_keys[fmt] for fmt in missing), _run_summary_pipeline, url, missing, max_length,
+            cache_keys, fetch_limit, summarize_limit, chapters
+        )
+        results.update({fmt: response.model_dump() for fmt, response in responses.items()})
+
+    first = results[format_types[0]]
+    summaries = {fmt: results[fmt]["summary"] for fmt in format_types} if isinstance(format_type, list) else None
+    return SummaryResponse(**{**first, "url": url, "summaries": summaries})
+
+
+async def _run_summary_pipeline(
+        url: str,
+        format_types: List[str],
+        max_length: int,
+        cache_keys: Dict[str, str],
+        fetch_limit: Optional[asyncio.Semaphore] = None,
+        summarize_limit: Optional[asyncio.Semaphore] = None,
+        chapters: bool = False
+) -> Dict[str, SummaryResponse]:
+    """
+    Fetch a video, summarize it in every requested format and cache each one.
+    """
+    # Get video information (title, etc.) and transcript from a single extraction
+    async with fetch_limit or nullcontext():
+        video = await aget_video_with_transcript(url)
+    video_title = video['info'].get('title', 'YouTube Video')
+    set_stage_labels(format_type=format_types, source=video['source'])
+
+    # Chapter mode needs chapter markers and cue timings; otherwise summarize the whole transcript
+    sections = split_chapters(video.get('cues') or [], video.get('chapters') or []) if chapters else []
+
+    # Generate summaries with the format types from the request
+    async with summarize_limit or nullcontext():
+        if sections:
+            summary_results = await asummarize_chapters_formats(sections, format_types, max_tokens=max_length)
+        else:
+            summary_results = await asummarize_transcript_formats(
+                transcript=video['transcript'],
+                format_types=format_types,
+                max_tokens=max_length
+            )
+    set_stage_labels(chunk_count=next(iter(summary_results.values()))["chunk_count"])
+
+    responses = {
+        fmt: SummaryResponse(
+            url=url,
+            title=video_title,
+            summary=result["summary"],
+            word_count=len(result["summary"].split()),
+            sections=result.get("sections")
+        )
+        for fmt, result in summary_results.items()
+    }
+    await asyncio.gather(*(
+        summary_cache.aset(cache_keys[fmt], response.model_dump()) for fmt, response in responses.items()
+    ))
+    return responses
+
+
+async def stream_summary_video(
+        url: str,
+        format_type: str = "paragraph",
+        max_length: int = 300,
+        chapters: bool = False
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Summarize a YouTube video, yielding (event, data) progress pairs.
+
+    Events are "metadata" as soon as the video's metadata is known,
+    "transcript" once its transcript is fetched,
+    "chunk" as each transcript chunk is mapped, "token" for each piece of the
+    final summary, then "summary" with the SummaryResponse fields. Failures
+    are reported as a final "error" event. Cached summaries are sent as a
+    single "summary" event. In chapter mode a "section" event per chapter
+    replaces the chunk and token events.
+
+    Args:
+        url: Validated YouTube URL
+        format_type: Format type ("paragraph", "bullet", or "detailed")
+        max_length: Maximum tokens for the summary
+        chapters: Summarize chapter by chapter when the video has chapters
+    """
+    try:
+        cache_key = summary_cache_key(url, format_type, max_length, chapters)
+
+        cached_summary = await summary_cache.aget(cache_key)
+        if cached_summary is not None:
+            yield "summary", {**cached_summary, "url": url}
+            return
+
+        # Metadata goes out as soon as yt-dlp has it, ahead of the subtitle download
+        async for event, data in astream_video_with_transcript(url):
+            if event == "info":
+                yield "metadata", {"url": url, **data}
+            else:
+                video = data
+        video_title = video['info'].get('title', 'YouTube Video')
+        set_stage_labels(format_type=format_type, source=video['source'])
+        yield "transcript", {"source": video['source'], "characters": len(video['transcript'])}
+
+        sections = split_chapters(video.get('cues') or [], video.get('chapters') or []) if chapters else []
+        if sections:
+            summary_result = await asummarize_chapters(sections, format_type=format_type, max_tokens=max_length)
+            set_stage_labels(chunk_count=summary_result["chunk_count"])
+            for section in summary_result["sections"]:
+                yield "section", section
+
+            response = SummaryResponse(
+                url=url,
+                title=video_title,
+                summary=summary_result["summary"],
+                word_count=summary_result["word_count"],
+                sections=summary_result["sections"]
+            )
+            await summary_cache.aset(cache_key, response.model_dump())
+            yield "summary", response.model_dump()
+            return
+
+        summarizer = await aget_summarizer(max_tokens=max_length)
+        async for event, data in summarizer.astream_summarize(video['transcript'], format_type):
+            if event != "summary":
+                yield event, data
+                continue
+
+            set_stage_labels(chunk_count=data["chunk_count"])
+            response = SummaryResponse(
+                url=url,
+                title=video_title,
+                summary=data["summary"],
+                word_count=data["word_count"]
+            )
+            await summary_cache.aset(cache_key, response.model_dump())
+            yield "summary", response.model_dump()
+    except Exception as e:
+        logger.exception("Error streaming summary for %s", url)
+        yield "error", {"detail": f"Error summarizing video: {str(e)}"}
+
+
+async def stream_batch_summaries(
+        urls: List[str],
+        playlist_url: Optional[str] = None,
+        format_type: str = "paragraph",
+        max_length: int = 300
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Summarize a list of videos and/or a playlist, yielding each result as it
+    finishes.
+
+    The playlist is expanded with one flat yt-dlp extraction and duplicate
+    video IDs are dropped. Fetch and summarize stages run under the
+    process-wide batch limits. Yields a "batch" event with the video list,
+    then a "video" event per video (in completion order) with either
+    "result" or "error", then "done".
+
+    Args:
+        urls: Validated YouTube video URLs
+        playlist_url: Optional validated playlist URL
+        format_type: Format type ("paragraph", "bullet", or "detailed")
+        max_length: Maximum tokens for each summary
+    """
+    try:
+        if playlist_url:
+            urls = list(urls) + await aexpand_playlist(playlist_url)
+    except Exception as e:
+        logger.exception("Error expanding playlist %s", playlist_url)
+        yield "error", {"detail": f"Error expanding playlist: {str(e)}"}
+        return
+
+    videos: Dict[str, str] = {}
+    invalid: List[str] = []
+    for url in urls:
+        try:
+            videos.setdefault(extract_video_id(url), url)
+        except ValueError:
+            invalid.append(url)
+    video_items = list(videos.items())[:BATCH_MAX_VIDEOS]
+
+    yield "batch", {
+        "total": len(video_items),
+        "duplicates": len(urls) - len(invalid) - len(videos),
+        "skipped": len(videos) - len(video_items),
+        "invalid": invalid,
+        "videos": [{"index": i, "video_id": video_id, "url": url} for i, (video_id, url) in enumerate(video_items)]
+    }
+
+    async def run(index: int, video_id: str, url: str) -> Dict[str, Any]:
+        item = {"index": index, "video_id": video_id, "url": url}
+        try:
+            response = await summarize_video(
+                url, format_type, max_length, batch_fetch_limit, batch_summarize_limit
+            )
+            return {**item, "result": response.model_dump()}
+        except Exception as e:
+            return {**item, "error": f"Error summarizing video: {str(e)}"}
+
+    tasks = [asyncio.ensure_future(run(i, video_id, url)) for i, (video_id, url) in enumerate(video_items)]
+    succeeded = 0
+    try:
+        for task in asyncio.as_completed(tasks):
+            item = await task
+            succeeded += "result" in item
+            yield "video", item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield "done", {"total": len(video_items), "succeeded": succeeded, "failed": len(video_items) - succeeded}
@@ -1,38 +1,280 @@
-from sqlalchemy.orm import Session
+import base64
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, contains_eager
 
 from app.summaryRepository import models
 
-def save_summary(db: Session, summary):
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "20"))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", "100"))
+# Characters of each summary returned by the history preview mode
+HISTORY_PREVIEW_CHARS = int(os.getenv("HISTORY_PREVIEW_CHARS", "200"))
+
+
+async def save_summary(db: AsyncSession, summary, owner_id: int):
     """
-    Save the summary to summary table.
+    Save the summary to summary table, owned by the given user.
     """
-    print(f"Saving summary: {summary['title']} - {summary['summary']} - {summary['metadata']['url']}")
     try:
         summaries = models.Summary()
         summaries.title = summary['title']
         summaries.summary = summary['summary']
         summaries.summary_metadata = models.SummaryMetadata()
         summaries.summary_metadata.url = summary['metadata']['url']
+        summaries.summary_metadata.owner_id = owner_id
         db.add(summaries)
-        db.commit()
-        db.refresh(summaries)
+        await db.commit()
+        await db.refresh(summaries)
         return summaries
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise e
 
 
-def get_histories(db: Session):
+def encode_history_cursor(created_at: datetime, metadata_id: int) -> str:
+    """
+    Encode the position after a history row as an opaque cursor.
+    """
+    payload = json.dumps([created_at.isoformat(), metadata_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_history_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, metadata_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(metadata_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def get_histories(
+        db: AsyncSession,
+        owner_id: int,
+        limit: int = HISTORY_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        preview_chars: Optional[int] = None
+):
+    """
+    Get one page of a user's summary histories, newest first.
+
+    Uses keyset pagination on (createdAt, metadata id) within the owner's
+    rows, served by the (owner_id, createdAt, id) index, so every page costs
+    the same however deep it is and however many rows other users have.
+    Metadata is joined in the same query and only the listed columns are
+    selected. With preview_chars, only that many characters of each summary
+    are read.
+
+    Returns:
+        Tuple[list, Optional[str]]: Rows with id, title, summary, url and
+        createdAt, and the cursor for the next page (None on the last page)
+    """
+    summary_column = models.Summary.summary
+    if preview_chars is not None:
+        summary_column = func.substr(models.Summary.summary, 1, preview_chars).label("summary")
+
+    query = (
+        select(
+            models.Summary.id,
+            models.Summary.title,
+            summary_column,
+            models.SummaryMetadata.id.label("metadata_id"),
+            models.SummaryMetadata.url,
+            models.SummaryMetadata.createdAt
+        )
+        .join(models.SummaryMetadata, models.Summary.summary_metadata_id == models.SummaryMetadata.id)
+        .where(models.SummaryMetadata.owner_id == owner_id)
+    )
+
+    if cursor:
+        created_at, metadata_id = decode_history_cursor(cursor)
+        query = query.where(or_(
+            models.SummaryMetadata.createdAt < created_at,
+            and_(models.SummaryMetadata.createdAt == created_at, models.SummaryMetadata.id < metadata_id)
+        ))
+
+    result = await db.execute(
+        query
+        .order_by(models.SummaryMetadata.createdAt.desc(), models.SummaryMetadata.id.desc())
+        .limit(limit + 1)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1].createdAt, rows[-1].metadata_id)
+    return rows, next_cursor
+
+
+async def get_history_by_id(db: AsyncSession, id: int, owner_id: int):
+    """
+    Get the summary history by id from summary table, if the user owns it.
+    """
+    result = await db.execute(
+        select(models.Summary)
+        .join(models.Summary.summary_metadata)
+        .options(contains_eager(models.Summary.summary_metadata))
+        .where(models.Summary.id == id, models.SummaryMetadata.owner_id == owner_id)
+    )
+    return result.scalars().all()
+
+
+def create_job(db: Session, url: str, format_type: Union[str, List[str]], max_length: int, chapters: bool = False):
     """
-    Get the summary histories from summary table.
+    Queue a summary job. A list of formats is stored as a JSON array.
     """
-    summaries = db.query(models.Summary).all()
-    return summaries
+    job = models.SummaryJob(
+        id=uuid.uuid4().hex,
+        url=url,
+        format_type=format_type if isinstance(format_type, str) else json.dumps(format_type),
+        max_length=max_length,
+        chapters=chapters,
+        status="queued",
+        attempts=0
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
 
 
-def get_history_by_id(db: Session, id: int):
+def job_format_type(job) -> Union[str, List[str]]:
     """
-    Get the summary history by id from summary table.
+    Get a job's format_type as it was requested: a single format or a list.
+    """
+    if job.format_type.startswith("["):
+        return json.loads(job.format_type)
+    return job.format_type
+
+
+def get_job(db: Session, job_id: str):
+    """
+    Get a summary job by id.
+    """
+    return db.get(models.SummaryJob, job_id)
+
+
+def claim_next_job(db: Session) -> Optional[models.SummaryJob]:
+    """
+    Atomically move the oldest queued job that is due to running and return it.
+
+    The conditional UPDATE makes the claim safe when several workers poll
+    the same table: only one of them sees a row count of 1.
+    """
+    while True:
+        now = datetime.now()
+        job_id = (
+            db.query(models.SummaryJob.id)
+            .filter(
+                models.SummaryJob.status == "queued",
+                or_(models.SummaryJob.notBefore.is_(None), models.SummaryJob.notBefore <= now)
+            )
+            .order_by(models.SummaryJob.createdAt)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            return None
+
+        claimed = (
+            db.query(models.SummaryJob)
+            .filter(models.SummaryJob.id == job_id, models.SummaryJob.status == "queued")
+            .update({
+                models.SummaryJob.status: "running",
+                models.SummaryJob.startedAt: now,
+                models.SummaryJob.attempts: models.SummaryJob.attempts + 1
+            }, synchronize_session=False)
+        )
+        db.commit()
+        if claimed:
+            return db.get(models.SummaryJob, job_id)
+
+
+def _claimed_job(db: Session, job_id: str, attempt: int):
+    # Only the worker holding this attempt may record its outcome; once the
+    # reaper has requeued the job (and another worker may have claimed it),
+    # a late result from the old attempt is dropped
+    return db.query(models.SummaryJob).filter(
+        models.SummaryJob.id == job_id,
+        models.SummaryJob.status == "running",
+        models.SummaryJob.attempts == attempt
+    )
+
+
+def complete_job(db: Session, job_id: str, attempt: int, result: dict) -> bool:
+    """
+    Mark a job as succeeded with its result.
+
+    Returns:
+        bool: False if the job is no longer running under this attempt
+    """
+    updated = _claimed_job(db, job_id, attempt).update({
+        models.SummaryJob.status: "succeeded",
+        models.SummaryJob.result: json.dumps(result),
+        models.SummaryJob.error: None,
+        models.SummaryJob.finishedAt: datetime.now()
+    }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def fail_job(
+        db: Session,
+        job_id: str,
+        attempt: int,
+        error: str,
+        retry: bool = False,
+        retry_delay_seconds: float = 0
+) -> bool:
+    """
+    Mark a job as failed, or put it back in the queue when retry is set. A
+    requeued job is not claimed again for retry_delay_seconds.
+
+    Returns:
+        bool: False if the job is no longer running under this attempt
+    """
+    updated = _claimed_job(db, job_id, attempt).update({
+        models.SummaryJob.status: "queued" if retry else "failed",
+        models.SummaryJob.error: error,
+        models.SummaryJob.finishedAt: None if retry else datetime.now(),
+        models.SummaryJob.notBefore: datetime.now() + timedelta(seconds=retry_delay_seconds) if retry else None
+    }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+
+def requeue_stale_jobs(db: Session, stale_seconds: int, max_attempts: int) -> int:
+    """
+    Recover jobs left running by a crashed worker.
+
+    Jobs running longer than stale_seconds are queued again, or failed once
+    they have used max_attempts. stale_seconds must exceed the job timeout,
+    so that a live worker gets to record its own timeout first.
     """
-    summaries = db.query(models.Summary).filter(models.Summary.id == id).all()
-    return summaries
+    cutoff = datetime.now() - timedelta(seconds=stale_seconds)
+    stale = db.query(models.SummaryJob).filter(
+        models.SummaryJob.status == "running",
+        models.SummaryJob.startedAt < cutoff
+    )
+    failed = stale.filter(models.SummaryJob.attempts >= max_attempts).update({
+        models.SummaryJob.status: "failed",
+        models.SummaryJob.error: "Job timed out",
+        models.SummaryJob.finishedAt: datetime.now()
+    }, synchronize_session=False)
+    requeued = stale.update({
+        models.SummaryJob.status: "queued"
+    }, synchronize_session=False)
+    db.commit()
+    return failed + requeued
@@ -0,0 +1,120 @@
+import html
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+# Private-use characters the database marks matches with; the snippet is
+# HTML-escaped before they are swapped for the <mark> tags, so stored text
+# can never inject markup
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+# Rank first, then compute highlighted snippets for the page rows only
+_POSTGRES_SEARCH = text("""
+    SELECT page.id, page.title, page.url, page."createdAt", page.rank,
+           ts_headline('english', coalesce(s.summary, ''), websearch_to_tsquery('english', :query),
+                       'StartSel=' || :match_start || ', StopSel=' || :match_end ||
+                       ', MaxFragments=2, MaxWords=30, MinWords=10')
+               AS snippet
+    FROM (
+        SELECT s.id, s.title, m.url, m."createdAt", ts_rank_cd(s.search_vector, q) AS rank
+        FROM summaries s
+        JOIN metadata m ON m.id = s.summary_metadata_id,
+             websearch_to_tsquery('english', :query) q
+        WHERE m.owner_id = :owner_id AND s.search_vector @@ q
+        ORDER BY rank DESC, s.id DESC
+        LIMIT :limit OFFSET :offset
+    ) page
+    JOIN summaries s ON s.id = page.id
+    ORDER BY page.rank DESC, page.id DESC
+""").columns(createdAt=DateTime)
+
+# bm25() is lower-is-better; titles weigh more than bodies
+_SQLITE_SEARCH = text("""
+    SELECT s.id, s.title, m.url, m."createdAt", -bm25(summaries_fts, 5.0, 1.0) AS rank,
+           snippet(summaries_fts, 1, :match_start, :match_end, '…', 24) AS snippet
+    FROM summaries_fts
+    JOIN summaries s ON s.id = summaries_fts.rowid
+    JOIN metadata m ON m.id = s.summary_metadata_id
+    WHERE summaries_fts MATCH :query AND m.owner_id = :owner_id
+    ORDER BY bm25(summaries_fts, 5.0, 1.0), s.id DESC
+    LIMIT :limit OFFSET :offset
+""").columns(createdAt=DateTime)
+
+
+def _fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word, so user input
+    can't be parsed as FTS5 syntax.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def _highlight(snippet: Optional[str]) -> Optional[str]:
+    """
+    HTML-escape a snippet and turn the database's match markers into <mark> tags.
+    """
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+async def search_summaries(
+        db: AsyncSession,
+        owner_id: int,
+        query: str,
+        limit: int = SEARCH_PAGE_SIZE,
+        offset: int = 0
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Full-text search over a user's saved summary titles and bodies.
+
+    Uses the tsvector/GIN index on PostgreSQL and the FTS5 table on SQLite
+    (see models.SEARCH_INDEX_DDL). Snippets are HTML: the summary text is
+    escaped and matches are wrapped in <mark> tags. Titles are plain text.
+
+    Args:
+        db: Database session
+        owner_id: Id of the user whose summaries are searched
+        query: Search text
+        limit: Page size
+        offset: Number of results to skip
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[int]]: Results (id, title, url,
+        createdAt, rank, snippet) ranked best first, and the offset of the
+        next page (None on the last page)
+
+    Raises:
+        ValueError: If the database has no supported full-text index
+    """
+    if not query.strip():
+        return [], None
+
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        statement, search_query = _POSTGRES_SEARCH, query
+    elif dialect == "sqlite":
+        statement, search_query = _SQLITE_SEARCH, _fts5_query(query)
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    result = await db.execute(statement, {
+        "query": search_query,
+        "owner_id": owner_id,
+        "limit": limit + 1,
+        "offset": offset,
+        "match_start": _MATCH_START,
+        "match_end": _MATCH_END
+    })
+    rows = result.mappings().all()
+
+    next_offset = offset + limit if len(rows) > limit else None
+    results = [{**row, "snippet": _highlight(row["snippet"])} for row in rows[:limit]]
+    return results, next_offset
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Deadline for one shared call, so a hung call can't hold its key (and every
+# caller that joins it) forever
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "900"))
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key starts the coroutine; callers arriving while
+    it is still running wait on the same task and receive the same result or
+    the same exception. The call runs in its own task, so it finishes even
+    if the caller that started it is cancelled, as long as another caller
+    still waits for it. Once the last waiting caller is cancelled the call
+    is cancelled too, and a call running longer than timeout seconds fails
+    with asyncio.TimeoutError.
+    """
+
+    def __init__(self, timeout: Optional[float] = SINGLE_FLIGHT_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self._async_calls: Dict[str, _AsyncCall] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    async def ado(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        call = self._async_calls.get(key)
+        if call is None:
+            # The shared call runs as its own task, so no caller owns it
+            call = _AsyncCall(asyncio.ensure_future(asyncio.wait_for(fn(*args, **kwargs), self.timeout)))
+            self._async_calls[key] = call
+            call.task.add_done_callback(lambda done: self._finish_async_call(key, call))
+            with self._lock:
+                self._stats["executions"] += 1
+        else:
+            with self._lock:
+                self._stats["coalesced"] += 1
+
+        # Every caller, the first one included, waits through a shield: a
+        # cancelled caller doesn't fail the others
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Nobody waits for the result any more: stop the work, and
+                # let the next caller for this key start a fresh call
+                self._release(key, call)
+                call.task.cancel()
+
+    def _release(self, key: str, call: _AsyncCall) -> None:
+        if self._async_calls.get(key) is call:
+            del self._async_calls[key]
+
+    def _finish_async_call(self, key: str, call: _AsyncCall) -> None:
+        self._release(key, call)
+        if not call.task.cancelled():
+            # Mark retrieved so an error nobody waits for is not logged as unhandled
+            call.task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._async_calls)}
+
+
+summary_flight = SingleFlight()
@@ -1,61 +1,31 @@
-from langchain_core.prompts import PromptTemplate
-from langchain_openai.chat_models import ChatOpenAI
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import asyncio
+import logging
 import os
-from typing import Dict, Optional, List, Any
+from typing import Dict, Optional, List, Any, AsyncIterator, Tuple
 
+from app.observability import stage
+from app.summaryRepository.chunk_planner import ChunkPlan, count_tokens, plan_chunks, input_token_budget
 
-def create_summarizer(
-        provider: str = "openai",
-        api_key: Optional[str] = None,
-        model: Optional[str] = None,
-        max_tokens: int = 1000,
-        temperature: float = 0.2
-) -> callable:
-    """
-    Create a function to summarize YouTube video transcripts.
+logger = logging.getLogger(__name__)
 
-    Args:
-        provider: LLM provider ("openai" or "anthropic")
-        api_key: API key for the provider
-        model: Model name to use (provider-specific)
-        max_tokens: Maximum tokens for output
-        temperature: Temperature for generation
+# Upper bound on concurrent map-stage LLM calls per summary
+MAP_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAP_MAX_CONCURRENCY", "8"))
+# Attempts per chunk before the whole summary is failed
+MAP_MAX_ATTEMPTS = int(os.getenv("SUMMARY_MAP_MAX_ATTEMPTS", "3"))
+# Safety stop for the tree reduce of very long transcripts
+REDUCE_MAX_LEVELS = int(os.getenv("SUMMARY_REDUCE_MAX_LEVELS", "5"))
 
-    Returns:
-        callable: A function that takes transcript text and summarization options
-    """
-    # Configure model
-    if provider.lower() == "openai":
-        if api_key:
-            os.environ["OPENAI_API_KEY"] = api_key
-        llm = ChatOpenAI(
-            model=model or "gpt-3.5-turbo",
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-    # elif provider.lower() == "anthropic":
-    #     if api_key:
-    #         os.environ["ANTHROPIC_API_KEY"] = api_key
-    #     llm = ChatAnthropic(
-    #         model=model or "claude-3-sonnet-20240229",
-    #         temperature=temperature,
-    #         max_tokens=max_tokens
-    #     )
-    else:
-        raise ValueError(f"Unsupported provider: {provider}")
+# Bump whenever a prompt below changes so cached results are not reused
+PROMPT_VERSION = "3"
+# Bump whenever MAP_PROMPT_TEMPLATE changes; cached map outputs are keyed by it
+MAP_PROMPT_VERSION = "1"
 
-    # Set up text splitter
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=4000,
-        chunk_overlap=200,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
+DEFAULT_MODELS = {
+    "openai": "gpt-3.5-turbo",
+}
 
-    # Define prompts for different stages
-    map_prompt_template = """
+# Define prompts for different stages
+MAP_PROMPT_TEMPLATE = """
     You are a YouTube video summarizer that creates concise, informative summaries.
 
     Below is a segment of a transcript from a YouTube video:
@@ -66,7 +36,7 @@ def create_summarizer(
     Ignore filler words, repetitions, and tangential information.
     """
 
-    combine_prompt_template = """
+COMBINE_PROMPT_TEMPLATE = """
     You are a YouTube video summarizer that creates concise, informative summaries.
 
     Below are the extracted key points from different segments of a YouTube video transcript:
@@ -80,137 +50,545 @@ def create_summarizer(
     {format_instructions}
     """
 
-    # Create LCEL chains
-    map_prompt = PromptTemplate.from_template(map_prompt_template)
+# Merges a batch of chunk summaries during the tree reduce of long transcripts
+COLLAPSE_PROMPT_TEMPLATE = """
+    You are a YouTube video summarizer that creates concise, informative summaries.
+
+    Below are the extracted key points from consecutive segments of a YouTube video transcript:
 
-    map_chain = (
-            {"text": RunnablePassthrough()}
-            | map_prompt
-            | llm
-            | StrOutputParser()
-    )
+    {text}
+
+    Consolidate them into a single list of key points, main ideas, and important details, in the order they occur.
+    Merge duplicates and drop repetitions, but keep every distinct point.
+    """
+
+# Used instead of map + combine when the whole transcript fits in one call
+DIRECT_PROMPT_TEMPLATE = """
+    You are a YouTube video summarizer that creates concise, informative summaries.
+
+    Below is the transcript of a YouTube video:
+
+    {text}
+
+    Create a coherent, well-structured summary that captures the main points and important details of the video.
+    Ignore filler words, repetitions, and tangential information.
+    Focus on delivering maximum value to someone who hasn't watched the video.
+    Include any important conclusions, recommendations, or actionable insights.
 
-    # Function to get format instructions based on format_type
-    def get_format_instructions(format_type):
-        if format_type == "bullet":
-            return "Format your summary as a bulleted list of key points."
-        elif format_type == "detailed":
-            return "Provide a detailed summary with sections for Introduction, Main Content, and Conclusion."
-        else:  # paragraph
-            return "Your summary should be in paragraph form, around 250-300 words."
-
-    # Function to summarize
-    def summarize(
+    {format_instructions}
+    """
+
+FORMAT_TYPES = ("paragraph", "bullet", "detailed")
+
+
+def resolve_model(provider: str, model: Optional[str] = None) -> str:
+    """
+    Resolve the model name actually used for a provider.
+
+    Args:
+        provider: LLM provider ("openai" or "anthropic")
+        model: Explicit model name, if any
+
+    Returns:
+        str: Model name
+    """
+    provider = provider.lower()
+    if provider not in DEFAULT_MODELS:
+        raise ValueError(f"Unsupported provider: {provider}")
+    return model or DEFAULT_MODELS[provider]
+
+
+# Function to get format instructions based on format_type
+def get_format_instructions(format_type: str) -> str:
+    if format_type == "bullet":
+        return "Format your summary as a bulleted list of key points."
+    elif format_type == "detailed":
+        return "Provide a detailed summary with sections for Introduction, Main Content, and Conclusion."
+    else:  # paragraph
+        return "Your summary should be in paragraph form, around 250-300 words."
+
+
+def _final_inputs(text: str, format_type: str) -> Dict[str, str]:
+    return {"text": text, "format_instructions": get_format_instructions(format_type)}
+
+
+class Summarizer:
+    """
+    Ready-to-use transcript summarizer.
+
+    Holds the LLM client, text splitter and LCEL chains so they are built once
+    and reused across requests.
+
+    Chunks are sized in tokens against the model's context window and output
+    budget. Transcripts that fit in one call skip the map stage and are
+    summarized by a single formatted-summary call. When the chunk summaries
+    are too large for one combine call they are tree-reduced: grouped into
+    batches that fit the context and collapsed in parallel, level by level,
+    before the formatted combine.
+
+    Map outputs do not depend on the format, so with a map_cache (a
+    TwoTierCache) each chunk's output is reused across formats and a format
+    switch only costs the combine call.
+    """
+
+    def __init__(
+            self,
+            llm,
+            model: str,
+            max_tokens: int = 1000,
+            max_concurrency: Optional[int] = None,
+            temperature: Optional[float] = None,
+            map_cache: Any = None
+    ):
+        # LangChain takes over a second to import, so it is loaded by the
+        # first summarizer rather than at app startup
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.runnables import RunnablePassthrough
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        self.llm = llm
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_concurrency = max(1, max_concurrency or MAP_MAX_CONCURRENCY)
+        self.temperature = temperature
+        self.map_cache = map_cache
+
+        # Prompt sizes without content, using the longest format instructions
+        longest_instructions = max((get_format_instructions(f) for f in FORMAT_TYPES), key=len)
+        self.map_prompt_tokens = count_tokens(MAP_PROMPT_TEMPLATE.format(text=""), model)
+        self.direct_prompt_tokens = count_tokens(
+            DIRECT_PROMPT_TEMPLATE.format(text="", format_instructions=longest_instructions), model
+        )
+        self.combine_budget = input_token_budget(model, max_tokens, count_tokens(
+            COMBINE_PROMPT_TEMPLATE.format(text="", format_instructions=longest_instructions), model
+        ))
+        self.collapse_budget = input_token_budget(model, max_tokens, count_tokens(
+            COLLAPSE_PROMPT_TEMPLATE.format(text=""), model
+        ))
+
+        # Set up token-aware text splitter
+        chunk_plan = self.plan("")
+        self.chunk_tokens = chunk_plan.chunk_tokens
+        self.text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_plan.chunk_tokens,
+            chunk_overlap=chunk_plan.overlap_tokens,
+            separators=["\n\n", "\n", ". ", " ", ""],
+            length_function=lambda text: count_tokens(text, model)
+        )
+
+        # Create LCEL chains
+        map_prompt = PromptTemplate.from_template(MAP_PROMPT_TEMPLATE)
+        combine_prompt = PromptTemplate.from_template(COMBINE_PROMPT_TEMPLATE)
+        direct_prompt = PromptTemplate.from_template(DIRECT_PROMPT_TEMPLATE)
+        collapse_prompt = PromptTemplate.from_template(COLLAPSE_PROMPT_TEMPLATE)
+
+        self.map_chain = (
+                {"text": RunnablePassthrough()}
+                | map_prompt
+                | llm
+                | StrOutputParser()
+        )
+
+        # Each chunk is retried on its own, so one flaky call doesn't restart the video
+        self.map_chain_with_retry = self.map_chain.with_retry(stop_after_attempt=MAP_MAX_ATTEMPTS)
+
+        self.combine_chain = (
+                combine_prompt
+                | llm
+                | StrOutputParser()
+        )
+
+        self.direct_chain = (
+                direct_prompt
+                | llm
+                | StrOutputParser()
+        )
+
+        self.collapse_chain = (
+                {"text": RunnablePassthrough()}
+                | collapse_prompt
+                | llm
+                | StrOutputParser()
+        ).with_retry(stop_after_attempt=MAP_MAX_ATTEMPTS)
+
+    def plan(self, transcript: str) -> ChunkPlan:
+        """
+        Plan how a transcript is split for this model and output budget.
+        """
+        return plan_chunks(
+            count_tokens(transcript, self.model),
+            self.model,
+            self.max_tokens,
+            self.direct_prompt_tokens,
+            self.map_prompt_tokens
+        )
+
+    def _split(self, transcript: str) -> Tuple[ChunkPlan, List[str]]:
+        """
+        Plan the transcript's chunking and split it, unless it fits one call.
+        """
+        with stage("chunking"):
+            chunk_plan = self.plan(transcript)
+            return chunk_plan, [] if chunk_plan.direct else self.text_splitter.split_text(transcript)
+
+    async def _asplit(self, transcript: str) -> Tuple[ChunkPlan, List[str]]:
+        # Tokenizing a long transcript takes long enough to stall the event loop
+        return await asyncio.to_thread(self._split, transcript)
+
+    def _split_sections(self, sections: List[str]) -> List[List[str]]:
+        """
+        Split each section into map chunks, keeping sections that fit one chunk whole.
+        """
+        with stage("chunking"):
+            return [
+                [section] if count_tokens(section, self.model) <= self.chunk_tokens
+                else self.text_splitter.split_text(section)
+                for section in sections
+            ]
+
+    async def _ainvoke_all(self, fn, inputs: List[Any]) -> List[str]:
+        """
+        Await fn on every input, at most max_concurrency at a time, returning
+        results in input order.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def invoke(item: Any) -> str:
+            async with semaphore:
+                return await fn(item)
+
+        return list(await asyncio.gather(*(invoke(item) for item in inputs)))
+
+    def map_cache_key(self, chunk: str) -> str:
+        """
+        Build the map-output cache key for a chunk.
+
+        The map output is capped at max_tokens, so it is part of the key too.
+        """
+        return self.map_cache.make_key(chunk, MAP_PROMPT_VERSION, self.model, self.temperature, self.max_tokens)
+
+    async def _amap_chunk(self, chunk: str) -> str:
+        """
+        Map one chunk, serving repeats from the map-output cache.
+        """
+        if self.map_cache is None:
+            with stage("map"):
+                return await self.map_chain_with_retry.ainvoke(chunk)
+
+        key = self.map_cache_key(chunk)
+        cached = await self.map_cache.aget(key)
+        if cached is not None:
+            return cached["summary"]
+
+        with stage("map"):
+            summary = await self.map_chain_with_retry.ainvoke(chunk)
+        await self.map_cache.aset(key, {"summary": summary})
+        return summary
+
+    async def amap_chunks(self, chunks: List[str]) -> List[str]:
+        """
+        Summarize chunks concurrently, returning results in chunk order.
+        """
+        return await self._ainvoke_all(self._amap_chunk, chunks)
+
+    def _reduce_groups(self, summaries: List[str], level: int) -> Optional[List[str]]:
+        """
+        Group summaries into batches for the next collapse level.
+
+        Returns None once the summaries fit a single combine call, or when
+        the level limit is reached or no two summaries fit one batch. Each batch holds consecutive summaries that
+        together fit the collapse budget.
+        """
+        if level >= REDUCE_MAX_LEVELS or len(summaries) < 2:
+            return None
+
+        counts = [count_tokens(summary, self.model) for summary in summaries]
+        if sum(counts) <= self.combine_budget:
+            return None
+
+        groups, current, current_tokens = [], [], 0
+        for summary, tokens in zip(summaries, counts):
+            if current and current_tokens + tokens > self.collapse_budget:
+                groups.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        groups.append("\n\n".join(current))
+
+        # A level that can't merge anything would only repeat itself
+        if len(groups) == len(summaries):
+            return None
+        return groups
+
+    async def areduce_summaries(self, summaries: List[str]) -> Tuple[str, int]:
+        """
+        Tree-reduce chunk summaries until they fit one combine call.
+
+        Returns:
+            Tuple[str, int]: Text for the combine step and number of reduce levels
+        """
+        level = 0
+        groups = self._reduce_groups(summaries, level)
+        while groups is not None:
+            with stage("reduce"):
+                summaries = await self._ainvoke_all(self.collapse_chain.ainvoke, groups)
+            level += 1
+            groups = self._reduce_groups(summaries, level)
+        return "\n\n".join(summaries), level
+
+    async def acombine_formats(self, summaries: List[str], format_types: List[str]) -> Tuple[Dict[str, str], int]:
+        """
+        Tree-reduce summaries once, then write every format concurrently.
+
+        Returns:
+            Tuple[Dict[str, str], int]: Final summary per format and number of reduce levels
+        """
+        combined_summaries, reduce_levels = await self.areduce_summaries(summaries)
+        with stage("combine"):
+            final_summaries = await asyncio.gather(*(
+                self.combine_chain.ainvoke(_final_inputs(combined_summaries, format_type))
+                for format_type in format_types
+            ))
+        return dict(zip(format_types, final_summaries)), reduce_levels
+
+    async def asummarize_sections(self, sections: List[str]) -> List[str]:
+        """
+        Extract key points from each section (e.g. a chapter) separately.
+
+        Sections that fit one map chunk are mapped as they are, with no
+        overlap padding across section boundaries. Longer sections are split,
+        mapped and collapsed into one summary. All map calls share one
+        bounded parallel pass.
+
+        Args:
+            sections: Section texts
+
+        Returns:
+            List[str]: Key-point summary per section, in section order
+        """
+        pieces = await asyncio.to_thread(self._split_sections, sections)
+        mapped = await self.amap_chunks([piece for section_pieces in pieces for piece in section_pieces])
+
+        async def collapse(piece_summaries: List[str]) -> str:
+            if len(piece_summaries) == 1:
+                return piece_summaries[0]
+            reduced, _ = await self.areduce_summaries(piece_summaries)
+            return await self.collapse_chain.ainvoke(reduced)
+
+        offset, grouped = 0, []
+        for section_pieces in pieces:
+            grouped.append(mapped[offset:offset + len(section_pieces)])
+            offset += len(section_pieces)
+        return list(await asyncio.gather(*(collapse(group) for group in grouped)))
+
+    async def asummarize_formats(
+            self,
             transcript: str,
-            format_type: str = "paragraph"
-    ) -> Dict[str, Any]:
+            format_types: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Summarize a YouTube video transcript.
+        Summarize a transcript in several formats at once.
+
+        The map and reduce stages run once; only the final formatted call is
+        made per format, and those calls run concurrently.
 
         Args:
             transcript: The transcript text
-            format_type: Format type ("paragraph", "bullet", or "detailed")
+            format_types: Format types ("paragraph", "bullet", or "detailed")
 
         Returns:
-            Dict[str, Any]: Dictionary with summary and metadata
+            Dict[str, Dict[str, Any]]: Summary dictionary per format type
         """
         if not transcript or len(transcript.strip()) < 100:
             raise ValueError("Transcript is too short or empty")
 
-        # Split text into chunks
-        chunks = text_splitter.split_text(transcript)
+        chunk_plan, chunks = await self._asplit(transcript)
+        if chunk_plan.direct:
+            with stage("direct"):
+                final_summaries = dict(zip(format_types, await asyncio.gather(*(
+                    self.direct_chain.ainvoke(_final_inputs(transcript, format_type)) for format_type in format_types
+                ))))
+            chunk_count, reduce_levels = 1, 0
+        else:
+            chunk_summaries = await self.amap_chunks(chunks)
+            final_summaries, reduce_levels = await self.acombine_formats(chunk_summaries, format_types)
+            chunk_count = len(chunks)
 
-        # Summarize each chunk
-        chunk_summaries = []
-        for chunk in chunks:
-            chunk_summary = map_chain.invoke(chunk)
-            chunk_summaries.append(chunk_summary)
+        return {
+            format_type: {
+                "summary": final_summary,
+                "word_count": len(final_summary.split()),
+                "format": format_type,
+                "chunk_count": chunk_count,
+                "direct": chunk_plan.direct,
+                "reduce_levels": reduce_levels
+            }
+            for format_type, final_summary in final_summaries.items()
+        }
 
-        # If only one chunk, format it according to the requested format
-        if len(chunks) == 1:
-            format_instructions = get_format_instructions(format_type)
+    async def astream_summarize(
+            self,
+            transcript: str,
+            format_type: str = "paragraph"
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Summarize a transcript, yielding progress and combine-stage tokens.
 
-            combine_prompt = PromptTemplate.from_template(
-                combine_prompt_template
-            )
+        Yields (event, data) pairs: "chunk" after each chunk is mapped (in
+        completion order), "token" for each piece of the final summary as the
+        model produces it, and finally "summary" with the same per-format
+        dictionary asummarize_formats returns. A "reduce" event with the number
+        of levels follows a tree reduce, when one was needed.
 
-            final_chain = (
-                    {"text": lambda _: chunk_summaries[0], "format_instructions": lambda _: format_instructions}
-                    | combine_prompt
-                    | llm
-                    | StrOutputParser()
-            )
+        Args:
+            transcript: The transcript text
+            format_type: Format type ("paragraph", "bullet", or "detailed")
+        """
+        if not transcript or len(transcript.strip()) < 100:
+            raise ValueError("Transcript is too short or empty")
 
-            final_summary = final_chain.invoke({})
+        chunk_plan, chunks = await self._asplit(transcript)
+        if chunk_plan.direct:
+            final_stage = "direct"
+            final_chain = self.direct_chain
+            final_inputs = _final_inputs(transcript, format_type)
+            chunk_count, reduce_levels = 1, 0
         else:
-            # Combine all chunk summaries
-            combined_summaries = "\n\n".join(chunk_summaries)
+            chunk_summaries: List[Optional[str]] = [None] * len(chunks)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def map_chunk(index: int, chunk: str) -> int:
+                async with semaphore:
+                    chunk_summaries[index] = await self._amap_chunk(chunk)
+                return index
+
+            tasks = [asyncio.ensure_future(map_chunk(i, chunk)) for i, chunk in enumerate(chunks)]
+            try:
+                for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+                    index = await task
+                    yield "chunk", {"index": index, "completed": completed, "total": len(chunks)}
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            combined_summaries, reduce_levels = await self.areduce_summaries(chunk_summaries)
+            if reduce_levels:
+                yield "reduce", {"levels": reduce_levels}
+
+            final_stage = "combine"
+            final_chain = self.combine_chain
+            final_inputs = _final_inputs(combined_summaries, format_type)
+            chunk_count = len(chunks)
+
+        # Includes the time the client takes to read each token
+        parts = []
+        with stage(final_stage):
+            async for token in final_chain.astream(final_inputs):
+                parts.append(token)
+                yield "token", {"text": token}
+
+        final_summary = "".join(parts)
+        yield "summary", {
+            "summary": final_summary,
+            "word_count": len(final_summary.split()),
+            "format": format_type,
+            "chunk_count": chunk_count,
+            "direct": chunk_plan.direct,
+            "reduce_levels": reduce_levels
+        }
 
-            # Create final summary with proper format
-            format_instructions = get_format_instructions(format_type)
 
-            combine_prompt = PromptTemplate.from_template(
-                combine_prompt_template
-            )
+def create_summarizer(
+        provider: str = "openai",
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.2,
+        max_concurrency: Optional[int] = None,
+        http_client: Any = None,
+        http_async_client: Any = None,
+        map_cache: Any = None
+) -> Summarizer:
+    """
+    Create a summarizer for YouTube video transcripts.
 
-            final_chain = (
-                    {"text": lambda _: combined_summaries, "format_instructions": lambda _: format_instructions}
-                    | combine_prompt
-                    | llm
-                    | StrOutputParser()
-            )
+    Args:
+        provider: LLM provider ("openai" or "anthropic")
+        api_key: API key for the provider
+        model: Model name to use (provider-specific)
+        max_tokens: Maximum tokens for output
+        temperature: Temperature for generation
+        max_concurrency: Maximum number of chunks mapped in parallel
+            (defaults to SUMMARY_MAP_MAX_CONCURRENCY)
+        http_client: Optional shared httpx.Client for the provider SDK
+        http_async_client: Optional shared httpx.AsyncClient for the provider SDK
+        map_cache: Optional TwoTierCache for map-stage outputs
 
-            final_summary = final_chain.invoke({})
+    Returns:
+        Summarizer: Summarizer for this provider, model and output budget
+    """
+    model = resolve_model(provider, model)
 
-        # Calculate approximate word count
-        word_count = len(final_summary.split())
+    # Configure model
+    if provider.lower() == "openai":
+        from langchain_openai.chat_models import ChatOpenAI
 
-        return {
-            "summary": final_summary,
-            "word_count": word_count,
-            "format": format_type,
-            "chunk_count": len(chunks)
-        }
+        if api_key:
+            os.environ["OPENAI_API_KEY"] = api_key
+        llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            http_client=http_client,
+            http_async_client=http_async_client
+        )
+    # elif provider.lower() == "anthropic":
+    #     if api_key:
+    #         os.environ["ANTHROPIC_API_KEY"] = api_key
+    #     llm = ChatAnthropic(
+    #         model=model or "claude-3-sonnet-20240229",
+    #         temperature=temperature,
+    #         max_tokens=max_tokens
+    #     )
+    else:
+        raise ValueError(f"Unsupported provider: {provider}")
 
-    return summarize
+    return Summarizer(
+        llm,
+        model,
+        max_tokens=max_tokens,
+        max_concurrency=max_concurrency,
+        temperature=temperature,
+        map_cache=map_cache
+    )
 
 
-# Usage wrapper function
-def summarize_transcript(
+async def asummarize_transcript_formats(
         transcript: str,
+        format_types: List[str],
         provider: str = "openai",
-        api_key: Optional[str] = None,
         model: Optional[str] = None,
-        format_type: str = "paragraph",
         max_tokens: int = 1000
-) -> Dict[str, Any]:
+) -> Dict[str, Dict[str, Any]]:
     """
-    Summarize a YouTube video transcript.
+    Summarize a transcript in several formats with one shared map stage.
 
     Args:
         transcript: The transcript text
+        format_types: Format types ("paragraph", "bullet", or "detailed")
         provider: LLM provider ("openai" or "anthropic")
-        api_key: API key for the provider
         model: Model name to use
-        format_type: Format type ("paragraph", "bullet", or "detailed")
         max_tokens: Maximum tokens for output
 
     Returns:
-        Dict[str, Any]: Dictionary with summary and metadata
+        Dict[str, Dict[str, Any]]: Summary dictionary per format type
     """
+    from app.summaryRepository.summarizer_registry import aget_summarizer
 
-    print('Transcript received')
-
-    summarizer = create_summarizer(
+    summarizer = await aget_summarizer(
         provider=provider,
-        api_key=api_key,
         model=model,
         max_tokens=max_tokens
     )
-
-    summary_dict = summarizer(transcript, format_type)
-
-    print('Summary Received')
-    print('Word Count:', summary_dict['word_count'])
-
-    return summary_dict
\ No newline at end of file
+    return await summarizer.asummarize_formats(transcript, format_types)
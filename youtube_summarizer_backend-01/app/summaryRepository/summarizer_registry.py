@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.summaryRepository.summarize_transcript import Summarizer, create_summarizer, resolve_model
+from app.summaryRepository.summary_cache import map_cache
+
+logger = logging.getLogger(__name__)
+
+# Connection pool shared by every registered summarizer
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+# max_tokens comes from the request, so the registry is an LRU rather than
+# keeping one summarizer per distinct value for the life of the process
+SUMMARIZER_REGISTRY_MAX_ENTRIES = int(os.getenv("SUMMARIZER_REGISTRY_MAX_ENTRIES", "32"))
+
+_lock = threading.Lock()
+_summarizers: "OrderedDict[Tuple[str, str, int, float], Summarizer]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    Get the process-wide keep-alive HTTP clients used for LLM calls.
+
+    Returns:
+        Tuple[httpx.Client, httpx.AsyncClient]: Sync and async clients
+    """
+    global _http_client, _http_async_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=_limits(), timeout=LLM_HTTP_TIMEOUT)
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(limits=_limits(), timeout=LLM_HTTP_TIMEOUT)
+        return _http_client, _http_async_client
+
+
+def _key(provider: str, model: Optional[str], max_tokens: int, temperature: float) -> Tuple[str, str, int, float]:
+    provider = provider.lower()
+    return provider, resolve_model(provider, model), max_tokens, temperature
+
+
+def _lookup(key: Tuple[str, str, int, float]) -> Optional[Summarizer]:
+    with _lock:
+        summarizer = _summarizers.get(key)
+        if summarizer is not None:
+            _summarizers.move_to_end(key)
+            _stats["hits"] += 1
+        return summarizer
+
+
+def get_summarizer(
+        provider: str = "openai",
+        model: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.2
+) -> Summarizer:
+    """
+    Get a ready-made summarizer, building it on first use.
+
+    Building one imports LangChain and loads the tokenizer on first use, so
+    async code should call aget_summarizer instead.
+
+    Args:
+        provider: LLM provider ("openai" or "anthropic")
+        model: Model name to use (provider-specific)
+        max_tokens: Maximum tokens for output
+        temperature: Temperature for generation
+
+    Returns:
+        Summarizer: Shared summarizer for this configuration
+    """
+    key = _key(provider, model, max_tokens, temperature)
+    summarizer = _lookup(key)
+    if summarizer is not None:
+        return summarizer
+
+    # Built outside the lock, so lookups (made from the event loop) never
+    # wait for a build; a concurrent build of the same key is discarded
+    http_client, http_async_client = get_http_clients()
+    built = create_summarizer(
+        provider=key[0],
+        model=key[1],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        http_client=http_client,
+        http_async_client=http_async_client,
+        map_cache=map_cache
+    )
+    with _lock:
+        summarizer = _summarizers.get(key)
+        if summarizer is not None:
+            _summarizers.move_to_end(key)
+            _stats["hits"] += 1
+            return summarizer
+
+        _summarizers[key] = built
+        while len(_summarizers) > SUMMARIZER_REGISTRY_MAX_ENTRIES:
+            _summarizers.popitem(last=False)
+            _stats["evictions"] += 1
+        _stats["misses"] += 1
+        return built
+
+
+async def aget_summarizer(
+        provider: str = "openai",
+        model: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.2
+) -> Summarizer:
+    """
+    Async version of get_summarizer: a registered summarizer is returned
+    right away, a new one is built in a thread.
+    """
+    summarizer = _lookup(_key(provider, model, max_tokens, temperature))
+    if summarizer is not None:
+        return summarizer
+    return await asyncio.to_thread(get_summarizer, provider, model, max_tokens, temperature)
+
+
+def warm_summarizer(max_tokens: int) -> None:
+    """
+    Build the default summarizer ahead of the first request, importing
+    LangChain and loading the tokenizer. Meant to run in a background thread
+    at startup; failures are logged and left to the first request.
+    """
+    try:
+        get_summarizer(max_tokens=max_tokens)
+    except Exception as e:
+        logger.warning("Summarizer warm-up failed: %s", e)
+
+
+def get_registry_stats() -> Dict[str, int]:
+    """
+    Get summarizer registry hit/miss statistics.
+
+    Returns:
+        Dict[str, int]: hits, misses, evictions and number of registered summarizers
+    """
+    with _lock:
+        return {
+            "hits": _stats["hits"],
+            "misses": _stats["misses"],
+            "evictions": _stats["evictions"],
+            "size": len(_summarizers),
+        }
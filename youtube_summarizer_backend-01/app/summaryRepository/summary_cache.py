@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app import database
+from app.summaryRepository import models
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SUMMARY_CACHE_MEMORY_ENTRIES = int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "512"))
+SUMMARY_CACHE_DB_MAX_ROWS = int(os.getenv("SUMMARY_CACHE_DB_MAX_ROWS", "10000"))
+# One map entry per transcript chunk, so this tier holds many more entries
+MAP_CACHE_MEMORY_ENTRIES = int(os.getenv("MAP_CACHE_MEMORY_ENTRIES", "4096"))
+MAP_CACHE_DB_MAX_ROWS = int(os.getenv("MAP_CACHE_DB_MAX_ROWS", "100000"))
+# Database-tier eviction (an expiry DELETE plus a namespace COUNT) runs once
+# every this many writes per process instead of on every write
+CACHE_DB_EVICT_EVERY_WRITES = int(os.getenv("CACHE_DB_EVICT_EVERY_WRITES", "100"))
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at or time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache:
+    """
+    JSON value cache with an in-memory LRU tier in front of a database tier.
+
+    Entries expire after ttl_seconds in both tiers. The memory tier is capped
+    at max_entries and the database tier at max_rows per namespace, evicting
+    the oldest entries first. The database tier is trimmed every
+    evict_every writes, so it can briefly hold up to that many extra rows
+    (per process) and expired rows linger until then; reads skip them.
+    Database failures are logged and treated as misses so the cache can
+    never fail a request.
+    """
+
+    def __init__(
+            self,
+            namespace: str,
+            ttl_seconds: int = SUMMARY_CACHE_TTL_SECONDS,
+            max_entries: int = SUMMARY_CACHE_MEMORY_ENTRIES,
+            max_rows: int = SUMMARY_CACHE_DB_MAX_ROWS,
+            evict_every: int = CACHE_DB_EVICT_EVERY_WRITES
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.evict_every = max(1, evict_every)
+        self.memory = LRUCache(max_entries, ttl_seconds)
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+
+    def make_key(self, *parts: Any) -> str:
+        """
+        Build a content-addressed key from the given parts.
+        """
+        digest = hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+        return f"{self.namespace}:{digest}"
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _eviction_due(self) -> bool:
+        with self._stats_lock:
+            self._writes += 1
+            return self._writes % self.evict_every == 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        try:
+            with database.SessionLocal() as db:
+                entry = db.get(models.CacheEntry, key)
+                if entry is not None and entry.expiresAt > datetime.now():
+                    value = json.loads(entry.value)
+                    self.memory.set(key, value, entry.expiresAt.timestamp())
+                    self._count("db_hits")
+                    return value
+        except Exception as e:
+            logger.warning("Cache read failed for %s: %s", self.namespace, e)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value)
+
+        try:
+            now = datetime.now()
+            with database.SessionLocal() as db:
+                db.merge(models.CacheEntry(
+                    key=key,
+                    namespace=self.namespace,
+                    value=json.dumps(value),
+                    createdAt=now,
+                    expiresAt=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                if self._eviction_due():
+                    db.flush()
+                    self._evict(db, now)
+                db.commit()
+        except Exception as e:
+            logger.warning("Cache write failed for %s: %s", self.namespace, e)
+
+    async def aget(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Async get: memory hits return inline, the database tier runs in a thread.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Dict[str, Any]) -> None:
+        self.memory.set(key, value)
+        await asyncio.to_thread(self.set, key, value)
+
+    def _evict(self, db, now: datetime) -> None:
+        entries = db.query(models.CacheEntry).filter(models.CacheEntry.namespace == self.namespace)
+        entries.filter(models.CacheEntry.expiresAt <= now).delete(synchronize_session=False)
+
+        overflow = entries.count() - self.max_rows
+        if overflow > 0:
+            oldest = (
+                db.query(models.CacheEntry.key)
+                .filter(models.CacheEntry.namespace == self.namespace)
+                .order_by(models.CacheEntry.createdAt)
+                .limit(overflow)
+                .subquery()
+            )
+            entries.filter(models.CacheEntry.key.in_(oldest.select())).delete(synchronize_session=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters, hit rate across both tiers and memory tier size.
+        """
+        with self._stats_lock:
+            lookups = sum(self._stats.values())
+            hits = self._stats["memory_hits"] + self._stats["db_hits"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_size": len(self.memory)
+            }
+
+
+summary_cache = TwoTierCache("summary")
+
+
+def make_summary_key(
+        video_id: str,
+        format_type: str,
+        max_length: int,
+        model: str,
+        prompt_version: str,
+        chapters: bool = False
+) -> str:
+    """
+    Build the summary cache key for a video and its summary options.
+    """
+    return summary_cache.make_key(video_id, format_type, max_length, model, prompt_version, chapters)
+
+
+# Format-independent key points of single chapters, reused across formats
+chapter_cache = TwoTierCache("chapter")
+
+# Map-stage output per transcript chunk, keyed by Summarizer.map_cache_key
+map_cache = TwoTierCache("map", max_entries=MAP_CACHE_MEMORY_ENTRIES, max_rows=MAP_CACHE_DB_MAX_ROWS)
+
+
+def make_chapter_key(chapter_text: str, max_length: int, model: str, prompt_version: str) -> str:
+    """
+    Build the chapter cache key from the chapter's transcript text and the summary options.
+    """
+    return chapter_cache.make_key(chapter_text, max_length, model, prompt_version)
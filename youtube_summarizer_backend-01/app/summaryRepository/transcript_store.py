@@ -0,0 +1,164 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import zstandard
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_STORE_DIR = os.getenv("TRANSCRIPT_STORE_DIR", ".transcript_store")
+TRANSCRIPT_STORE_TTL_SECONDS = int(os.getenv("TRANSCRIPT_STORE_TTL_SECONDS", str(30 * 24 * 3600)))
+TRANSCRIPT_STORE_MAX_BYTES = int(os.getenv("TRANSCRIPT_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+TRANSCRIPT_STORE_ZSTD_LEVEL = int(os.getenv("TRANSCRIPT_STORE_ZSTD_LEVEL", "10"))
+# Eviction scans and stats the whole directory, so it runs once every this
+# many writes per process instead of on every write
+TRANSCRIPT_STORE_EVICT_EVERY_WRITES = int(os.getenv("TRANSCRIPT_STORE_EVICT_EVERY_WRITES", "50"))
+
+_SAFE_KEY_PART = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class TranscriptStore:
+    """
+    On-disk transcript store keyed by (video_id, language, source).
+
+    Each entry is a zstd-compressed JSON document holding the cleaned text
+    and cue timings as [start, end, text] triples. Entries older than
+    ttl_seconds are treated as missing. A file's mtime records its last
+    access. Every evict_every writes, expired entries are removed and the
+    least recently used ones are evicted until the store fits max_bytes, so
+    it can briefly grow past max_bytes in between.
+    """
+
+    def __init__(
+            self,
+            directory: str = TRANSCRIPT_STORE_DIR,
+            ttl_seconds: int = TRANSCRIPT_STORE_TTL_SECONDS,
+            max_bytes: int = TRANSCRIPT_STORE_MAX_BYTES,
+            level: int = TRANSCRIPT_STORE_ZSTD_LEVEL,
+            evict_every: int = TRANSCRIPT_STORE_EVICT_EVERY_WRITES
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.level = level
+        self.evict_every = max(1, evict_every)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _path(self, video_id: str, language: str, source: str) -> str:
+        name = ".".join(_SAFE_KEY_PART.sub("_", part) for part in (video_id, language, source))
+        return os.path.join(self.directory, f"{name}.json.zst")
+
+    def get(self, video_id: str, language: str, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored transcript entry, or None if missing or expired.
+        """
+        path = self._path(video_id, language, source)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Transcript store read failed for %s: %s", video_id, e)
+            return None
+
+        if entry.get("created_at", 0) + self.ttl_seconds < time.time():
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def get_any(self, video_id: str, language: str, sources: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        Get the first stored entry among sources, in order of preference.
+        """
+        for source in sources:
+            entry = self.get(video_id, language, source)
+            if entry is not None:
+                return entry
+        return None
+
+    def put(
+            self,
+            video_id: str,
+            language: str,
+            source: str,
+            text: str,
+            cues: Optional[List[List[Any]]] = None,
+            meta: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a transcript and return the stored entry.
+        """
+        entry = {
+            "video_id": video_id,
+            "language": language,
+            "source": source,
+            "text": text,
+            "cues": cues or [],
+            "meta": meta or {},
+            "created_at": time.time(),
+        }
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(video_id, language, source)
+            data = zstandard.ZstdCompressor(level=self.level).compress(json.dumps(entry).encode("utf-8"))
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            if self._eviction_due():
+                self._evict()
+        except Exception as e:
+            logger.warning("Transcript store write failed for %s: %s", video_id, e)
+
+        return entry
+
+    def _eviction_due(self) -> bool:
+        with self._lock:
+            self._writes += 1
+            return self._writes % self.evict_every == 0
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            now = time.time()
+            files = []
+            total = 0
+            for item in os.scandir(self.directory):
+                if not item.name.endswith(".json.zst"):
+                    continue
+                stat = item.stat()
+                if stat.st_mtime + self.ttl_seconds < now:
+                    self._remove(item.path)
+                    continue
+                files.append((stat.st_mtime, stat.st_size, item.path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            # Least recently used first
+            for _, size, path in sorted(files):
+                self._remove(path)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+transcript_store = TranscriptStore()
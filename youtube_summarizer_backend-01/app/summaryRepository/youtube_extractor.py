@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+
+import httpx
+
+from app.observability import stage
+from app.summaryRepository.caption_parser import Captions, parse_captions
+from app.summaryRepository.transcript_store import transcript_store
+from app.summaryRepository.youtube_transcript_v2 import get_youtube_transcript_v2, extract_video_id, \
+    TRANSCRIPT_LANGUAGE, TRANSCRIPT_SOURCES
+
+logger = logging.getLogger(__name__)
+
+SUBTITLE_LANGUAGES = ['en', 'en-US', 'en-GB']
+# In order of preference; json3 and srv3 carry no rolling-caption repeats
+SUBTITLE_FORMATS = ['json3', 'srv3', 'vtt']
+
+YDL_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'skip_download': True,
+    # A watch URL shared from a playlist also carries &list=; summarize the video, not the playlist
+    'noplaylist': True,
+}
+
+# yt-dlp extraction is blocking, so it gets its own bounded pool
+# instead of competing for the server's default threadpool
+YTDLP_MAX_WORKERS = int(os.getenv("YTDLP_MAX_WORKERS", "16"))
+SUBTITLE_HTTP_TIMEOUT = float(os.getenv("SUBTITLE_HTTP_TIMEOUT", "30"))
+
+_ytdlp_executor: Optional[ThreadPoolExecutor] = None
+_subtitle_client: Optional[httpx.AsyncClient] = None
+
+
+async def aextract_info(youtube_url: str) -> Dict[str, Any]:
+    """
+    Get the raw yt-dlp info dict for a video (no format processing), on a
+    dedicated bounded thread pool.
+
+    Args:
+        youtube_url (str): YouTube video URL
+
+    Returns:
+        Dict[str, Any]: yt-dlp info dict
+    """
+    with stage("metadata"):
+        return await asyncio.get_running_loop().run_in_executor(_get_ytdlp_executor(), _extract_info, youtube_url)
+
+
+async def adownload_transcript(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Download and parse the best English subtitle track of an extracted video
+    with a shared async HTTP client, so no subprocess or temp directory is
+    involved.
+
+    Args:
+        info (Dict[str, Any]): yt-dlp info dict from aextract_info
+
+    Returns:
+        Dict[str, Any]: 'info' (title, duration, etc.), 'chapters', 'transcript'
+            (None if no English track), 'cues', 'language' and 'source'
+    """
+    with stage("transcript"):
+        track = select_subtitle_track(info)
+        content = None
+        if track:
+            response = await _get_subtitle_client().get(track['url'])
+            response.raise_for_status()
+            content = response.text
+
+        return _build_extraction(info, track, content)
+
+
+def expand_playlist(playlist_url: str) -> List[str]:
+    """
+    List the video URLs of a playlist with one flat yt-dlp extraction
+    (entries are not resolved individually).
+
+    Args:
+        playlist_url (str): YouTube playlist URL
+
+    Returns:
+        List[str]: Watch URLs in playlist order
+    """
+    with _youtube_dl({**YDL_OPTS, 'extract_flat': 'in_playlist', 'noplaylist': False}) as ydl:
+        info = ydl.extract_info(playlist_url, download=False)
+
+    entries = info.get('entries') or [info]
+    return [f"https://www.youtube.com/watch?v={entry['id']}" for entry in entries if entry and entry.get('id')]
+
+
+async def aexpand_playlist(playlist_url: str) -> List[str]:
+    """
+    Async version of expand_playlist, run on the yt-dlp thread pool.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_get_ytdlp_executor(), expand_playlist, playlist_url)
+
+
+def _youtube_dl(options: Dict[str, Any]):
+    # yt-dlp loads all of its extractors on import, so it is imported on
+    # first use (in a pool thread) instead of at app startup
+    import yt_dlp
+
+    return yt_dlp.YoutubeDL(options)
+
+
+def _extract_info(youtube_url: str) -> Dict[str, Any]:
+    with _youtube_dl(YDL_OPTS) as ydl:
+        return ydl.extract_info(youtube_url, download=False, process=False)
+
+
+def _get_ytdlp_executor() -> ThreadPoolExecutor:
+    global _ytdlp_executor
+    if _ytdlp_executor is None:
+        _ytdlp_executor = ThreadPoolExecutor(max_workers=YTDLP_MAX_WORKERS, thread_name_prefix="yt-dlp")
+    return _ytdlp_executor
+
+
+def _get_subtitle_client() -> httpx.AsyncClient:
+    global _subtitle_client
+    if _subtitle_client is None:
+        _subtitle_client = httpx.AsyncClient(timeout=SUBTITLE_HTTP_TIMEOUT, follow_redirects=True)
+    return _subtitle_client
+
+
+def _build_extraction(info: Dict[str, Any], track: Optional[Dict[str, Any]], content: Optional[str]) -> Dict[str, Any]:
+    captions = parse_captions(content, track['ext']) if content else Captions()
+    return {
+        'info': _video_info(info),
+        'chapters': info.get('chapters') or [],
+        'transcript': captions.text() or None,
+        'cues': captions.cues(),
+        'language': track['language'] if track else None,
+        'source': 'yt-dlp',
+    }
+
+
+def select_subtitle_track(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Pick the best English subtitle track, preferring manual subtitles over
+    automatic captions.
+
+    Args:
+        info (Dict[str, Any]): yt-dlp info dict
+
+    Returns:
+        Optional[Dict[str, Any]]: 'url', 'ext', 'language' and 'automatic' of the track
+    """
+    for automatic, tracks in ((False, info.get('subtitles') or {}),
+                              (True, info.get('automatic_captions') or {})):
+        for lang in SUBTITLE_LANGUAGES:
+            for ext in SUBTITLE_FORMATS:
+                for track in tracks.get(lang, []):
+                    if track.get('ext') == ext and track.get('url'):
+                        return {
+                            'url': track['url'],
+                            'ext': ext,
+                            'language': lang,
+                            'automatic': automatic,
+                        }
+    return None
+
+
+def _video_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    thumbnails: List[Dict[str, Any]] = info.get('thumbnails') or []
+    return {
+        'title': info.get('title', 'Unknown Title'),
+        'duration': info.get('duration', 0),
+        'description': info.get('description', ''),
+        'uploader': info.get('uploader', ''),
+        'upload_date': info.get('upload_date', ''),
+        'view_count': info.get('view_count', 0),
+        'thumbnail': info.get('thumbnail') or (thumbnails[-1].get('url', '') if thumbnails else ''),
+    }
+
+
+async def aget_video_with_transcript(youtube_url: str) -> Dict[str, Any]:
+    """
+    Get video metadata and English transcript, using the transcript store
+    first, then a single in-process extraction, then the v2 fallbacks.
+
+    Args:
+        youtube_url (str): YouTube video URL
+
+    Returns:
+        Dict[str, Any]: 'info', 'chapters', 'transcript' and 'source'
+
+    Raises:
+        ValueError: If no transcript can be retrieved
+    """
+    async for event, data in astream_video_with_transcript(youtube_url):
+        if event == "video":
+            return data
+
+
+async def astream_video_with_transcript(youtube_url: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Same as aget_video_with_transcript, but also reports the video metadata
+    as soon as it is known, before the subtitles are downloaded.
+
+    Yields ("info", video info) once, then ("video", the dictionary
+    aget_video_with_transcript returns).
+
+    Args:
+        youtube_url (str): YouTube video URL
+
+    Raises:
+        ValueError: If no transcript can be retrieved
+    """
+    video_id = extract_video_id(youtube_url)
+
+    with stage("transcript_store"):
+        stored = await asyncio.to_thread(transcript_store.get_any, video_id, TRANSCRIPT_LANGUAGE, TRANSCRIPT_SOURCES)
+    if stored and stored['meta'].get('info'):
+        yield "info", stored['meta']['info']
+        yield "video", {
+            'info': stored['meta']['info'],
+            'chapters': stored['meta'].get('chapters', []),
+            'cues': stored['cues'],
+            'transcript': stored['text'],
+            'source': stored['source'],
+        }
+        return
+
+    extraction = None
+    try:
+        info = await aextract_info(youtube_url)
+    except Exception as e:
+        logger.warning("In-process yt-dlp extraction failed: %s", e)
+        yield "info", {'title': 'YouTube Video'}
+    else:
+        yield "info", _video_info(info)
+        try:
+            extraction = await adownload_transcript(info)
+        except Exception as e:
+            logger.warning("Subtitle download failed: %s", e)
+            extraction = _build_extraction(info, None, None)
+
+    if extraction and extraction['transcript']:
+        await asyncio.to_thread(
+            transcript_store.put,
+            video_id,
+            TRANSCRIPT_LANGUAGE,
+            extraction['source'],
+            extraction['transcript'],
+            cues=extraction['cues'],
+            meta={'info': extraction['info'], 'chapters': extraction['chapters']}
+        )
+        yield "video", extraction
+        return
+
+    # No usable subtitle track: fall back to the subprocess/transcript-api methods
+    with stage("transcript"):
+        transcript = await asyncio.get_running_loop().run_in_executor(
+            _get_ytdlp_executor(), get_youtube_transcript_v2, youtube_url
+        )
+    yield "video", {
+        'info': extraction['info'] if extraction else {'title': 'YouTube Video'},
+        'chapters': extraction['chapters'] if extraction else [],
+        'cues': [],
+        'transcript': transcript,
+        'source': 'fallback',
+    }
@@ -1,6 +1,10 @@
+import logging
+
 from youtube_transcript_api import YouTubeTranscriptApi
 from urllib.parse import urlparse, parse_qs
 
+logger = logging.getLogger(__name__)
+
 
 def get_youtube_transcript(youtube_url: str) -> str:
     """
@@ -19,7 +23,7 @@ def get_youtube_transcript(youtube_url: str) -> str:
         # Extract video ID from URL
         video_id = extract_video_id(youtube_url)
 
-        print(f"Extracted video ID: {video_id}")
+        logger.debug("Extracted video ID: %s", video_id)
 
         # Get available transcripts (without proxy)
         transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
@@ -46,11 +50,7 @@ def get_youtube_transcript(youtube_url: str) -> str:
         transcript_data = transcript.fetch()
 
         # Format the transcript as plain text
-        formatted_transcript = ""
-        for entry in transcript_data:
-            formatted_transcript += entry['text'] + " "
-
-        return formatted_transcript.strip()
+        return " ".join(entry['text'] for entry in transcript_data).strip()
 
     except Exception as e:
         raise ValueError(f"Failed to retrieve transcript: {str(e)}")
@@ -72,7 +72,7 @@ def extract_video_id(youtube_url: str) -> str:
     # Handle different URL formats
     parsed_url = urlparse(youtube_url)
 
-    print(f'Parsed URL: {parsed_url}')
+    logger.debug("Parsed URL: %s", parsed_url)
 
     # Format: youtube.com/watch?v=VIDEO_ID
     if parsed_url.netloc in ('youtube.com', 'www.youtube.com') and parsed_url.path == '/watch':
@@ -1,10 +1,18 @@
+import logging
 import subprocess
-import json
 import tempfile
 import os
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse, parse_qs
 
+from app.summaryRepository.caption_parser import parse_vtt
+from app.summaryRepository.transcript_store import transcript_store
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_LANGUAGE = "en"
+TRANSCRIPT_SOURCES = ("yt-dlp", "youtube-transcript-api")
+
 
 def get_youtube_transcript_v2(youtube_url: str) -> str:
     """
@@ -22,20 +30,30 @@ def get_youtube_transcript_v2(youtube_url: str) -> str:
     """
     try:
         video_id = extract_video_id(youtube_url)
-        print(f"Extracted video ID: {video_id}")
+        logger.debug("Extracted video ID: %s", video_id)
+
+        # Serve previously fetched transcripts without hitting YouTube
+        stored = transcript_store.get_any(video_id, TRANSCRIPT_LANGUAGE, TRANSCRIPT_SOURCES)
+        if stored:
+            return stored['text']
         
         # Method 1: Try to get auto-generated subtitles using yt-dlp
-        transcript = _get_transcript_with_ytdlp(youtube_url)
+        result = _get_transcript_with_ytdlp(youtube_url)
         
-        if transcript:
-            return transcript
+        if result and result['transcript']:
+            transcript_store.put(
+                video_id, TRANSCRIPT_LANGUAGE, "yt-dlp", result['transcript'], cues=result['cues']
+            )
+            return result['transcript']
             
         # Method 2: Fallback to youtube-transcript-api without proxy
         try:
             from app.summaryRepository.youtube_transcript import get_youtube_transcript
-            return get_youtube_transcript(youtube_url)
+            transcript = get_youtube_transcript(youtube_url)
+            transcript_store.put(video_id, TRANSCRIPT_LANGUAGE, "youtube-transcript-api", transcript)
+            return transcript
         except Exception as e:
-            print(f"youtube-transcript-api fallback failed: {e}")
+            logger.warning("youtube-transcript-api fallback failed: %s", e)
             
         # Method 3: Extract audio and use speech recognition (if configured)
         # This would require additional setup - whisper/speech recognition
@@ -46,7 +64,7 @@ def get_youtube_transcript_v2(youtube_url: str) -> str:
         raise ValueError(f"Failed to retrieve transcript: {str(e)}")
 
 
-def _get_transcript_with_ytdlp(youtube_url: str) -> Optional[str]:
+def _get_transcript_with_ytdlp(youtube_url: str) -> Optional[Dict[str, Any]]:
     """
     Use yt-dlp to extract subtitles/transcript.
     
@@ -54,7 +72,7 @@ def _get_transcript_with_ytdlp(youtube_url: str) -> Optional[str]:
         youtube_url (str): YouTube video URL
         
     Returns:
-        Optional[str]: Transcript text if successful, None otherwise
+        Optional[Dict[str, Any]]: 'transcript' text and 'cues' timings if successful, None otherwise
     """
     try:
         # Create temporary directory for subtitle files
@@ -69,6 +87,7 @@ def _get_transcript_with_ytdlp(youtube_url: str) -> Optional[str]:
                 "--sub-langs", "en,en-US,en-GB",
                 "--sub-format", "vtt",
                 "--skip-download",
+                "--no-playlist",
                 "--output", subtitle_file,
                 youtube_url
             ]
@@ -80,101 +99,43 @@ def _get_transcript_with_ytdlp(youtube_url: str) -> Optional[str]:
                 for file in os.listdir(temp_dir):
                     if file.endswith('.vtt'):
                         subtitle_path = os.path.join(temp_dir, file)
-                        return _parse_vtt_file(subtitle_path)
+                        cues = _parse_vtt_cues(subtitle_path)
+                        return {
+                            'transcript': ' '.join(cue[2] for cue in cues),
+                            'cues': cues
+                        }
                         
-            print(f"yt-dlp subtitle extraction failed: {result.stderr}")
+            logger.warning("yt-dlp subtitle extraction failed: %s", result.stderr)
             return None
             
     except subprocess.TimeoutExpired:
-        print("yt-dlp timed out")
+        logger.warning("yt-dlp timed out")
         return None
     except FileNotFoundError:
-        print("yt-dlp not found. Please install it: pip install yt-dlp")
+        logger.error("yt-dlp not found. Please install it: pip install yt-dlp")
         return None
     except Exception as e:
-        print(f"yt-dlp error: {e}")
+        logger.warning("yt-dlp error: %s", e)
         return None
 
 
-def _parse_vtt_file(vtt_path: str) -> str:
+def _parse_vtt_cues(vtt_path: str) -> List[List[Any]]:
     """
-    Parse VTT subtitle file and extract text.
+    Parse VTT subtitle file into cues, streaming it line by line.
     
     Args:
         vtt_path (str): Path to VTT file
         
     Returns:
-        str: Extracted transcript text
+        List[List[Any]]: [start, end, text] for each distinct caption line
     """
     try:
         with open(vtt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        lines = content.split('\n')
-        transcript_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            # Skip empty lines, timestamps, and VTT headers
-            if (line and 
-                not line.startswith('WEBVTT') and 
-                not line.startswith('NOTE') and
-                not '-->' in line and
-                not line.isdigit()):
-                
-                # Clean up common subtitle artifacts
-                cleaned_line = line.replace('<c>', '').replace('</c>', '')
-                cleaned_line = cleaned_line.replace('<i>', '').replace('</i>', '')
-                cleaned_line = cleaned_line.replace('<b>', '').replace('</b>', '')
-                
-                if cleaned_line and cleaned_line not in transcript_lines:
-                    transcript_lines.append(cleaned_line)
-        
-        return ' '.join(transcript_lines)
+            return parse_vtt(f).cues()
         
     except Exception as e:
-        print(f"Error parsing VTT file: {e}")
-        return ""
-
-
-def get_video_info_ytdlp(youtube_url: str) -> Dict[str, Any]:
-    """
-    Get video information using yt-dlp.
-    
-    Args:
-        youtube_url (str): YouTube video URL
-        
-    Returns:
-        Dict[str, Any]: Video information including title, duration, etc.
-    """
-    try:
-        cmd = [
-            "yt-dlp",
-            "--dump-json",
-            "--no-download",
-            youtube_url
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
-            video_info = json.loads(result.stdout)
-            return {
-                'title': video_info.get('title', 'Unknown Title'),
-                'duration': video_info.get('duration', 0),
-                'description': video_info.get('description', ''),
-                'uploader': video_info.get('uploader', ''),
-                'upload_date': video_info.get('upload_date', ''),
-                'view_count': video_info.get('view_count', 0),
-                'thumbnail': video_info.get('thumbnail', ''),
-            }
-        else:
-            print(f"yt-dlp info extraction failed: {result.stderr}")
-            return {}
-            
-    except Exception as e:
-        print(f"Error getting video info: {e}")
-        return {}
+        logger.warning("Error parsing VTT file: %s", e)
+        return []
 
 
 def extract_video_id(youtube_url: str) -> str:
@@ -193,7 +154,7 @@ def extract_video_id(youtube_url: str) -> str:
     # Handle different URL formats
     parsed_url = urlparse(youtube_url)
     
-    print(f'Parsed URL: {parsed_url}')
+    logger.debug("Parsed URL: %s", parsed_url)
     
     # Format: youtube.com/watch?v=VIDEO_ID
     if parsed_url.netloc in ('youtube.com', 'www.youtube.com') and parsed_url.path == '/watch':
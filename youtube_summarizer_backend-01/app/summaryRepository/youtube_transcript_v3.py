@@ -5,6 +5,12 @@ from youtube_transcript_api import YouTubeTranscriptApi
 import yt_dlp
 from urllib.parse import urlparse, parse_qs
 
+from app.summaryRepository.caption_parser import parse_srv3
+from app.summaryRepository.transcript_store import transcript_store
+
+TRANSCRIPT_LANGUAGE = "en"
+TRANSCRIPT_SOURCES = ("youtube-transcript-api", "yt-dlp")
+
 def get_youtube_transcript_robust(youtube_url: str, max_retries: int = 3) -> Dict[str, Any]:
     """
     Robust YouTube transcript extraction with multiple fallback methods.
@@ -20,6 +26,16 @@ def get_youtube_transcript_robust(youtube_url: str, max_retries: int = 3) -> Dic
         ValueError: If all methods fail
     """
     video_id = extract_video_id(youtube_url)
+
+    # Serve previously fetched transcripts without hitting YouTube
+    stored = transcript_store.get_any(video_id, TRANSCRIPT_LANGUAGE, TRANSCRIPT_SOURCES)
+    if stored:
+        title = stored['meta'].get('title') or _get_title_ytdlp(youtube_url) or "YouTube Video"
+        return {
+            'transcript': stored['text'],
+            'title': title,
+            'method_used': f"transcript-store ({stored['source']})"
+        }
     
     # Method 1: Basic youtube-transcript-api (fastest)
     print("Attempting Method 1: Basic youtube-transcript-api...")
@@ -27,6 +43,9 @@ def get_youtube_transcript_robust(youtube_url: str, max_retries: int = 3) -> Dic
         transcript = _get_transcript_basic(video_id)
         if transcript:
             title = _get_title_ytdlp(youtube_url) or "YouTube Video"
+            transcript_store.put(
+                video_id, TRANSCRIPT_LANGUAGE, "youtube-transcript-api", transcript, meta={'title': title}
+            )
             return {
                 'transcript': transcript,
                 'title': title,
@@ -41,6 +60,9 @@ def get_youtube_transcript_robust(youtube_url: str, max_retries: int = 3) -> Dic
         try:
             result = _get_transcript_ytdlp_robust(youtube_url, attempt)
             if result:
+                transcript_store.put(
+                    video_id, TRANSCRIPT_LANGUAGE, "yt-dlp", result['transcript'], meta={'title': result['title']}
+                )
                 return {
                     'transcript': result['transcript'],
                     'title': result['title'],
@@ -58,6 +80,9 @@ def get_youtube_transcript_robust(youtube_url: str, max_retries: int = 3) -> Dic
     try:
         result = _get_transcript_ytdlp_alternative(youtube_url)
         if result:
+            transcript_store.put(
+                video_id, TRANSCRIPT_LANGUAGE, "yt-dlp", result['transcript'], meta={'title': result['title']}
+            )
             return {
                 'transcript': result['transcript'],
                 'title': result['title'],
@@ -193,20 +218,12 @@ def _download_subtitle_content(subtitle_url: str) -> Optional[str]:
     """Download and parse subtitle content."""
     try:
         import requests
-        import xml.etree.ElementTree as ET
         
         response = requests.get(subtitle_url, timeout=10)
         response.raise_for_status()
         
-        # Parse XML subtitle content
-        root = ET.fromstring(response.content)
-        transcript_parts = []
-        
-        for text_elem in root.findall('.//text'):
-            if text_elem.text:
-                transcript_parts.append(text_elem.text.strip())
-        
-        return " ".join(transcript_parts)
+        # Parse timed-text XML subtitle content
+        return parse_srv3(response.content, keep_timings=False).text()
     except:
         return None
 
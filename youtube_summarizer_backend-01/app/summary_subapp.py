@@ -4,7 +4,7 @@ import os
 from starlette.responses import JSONResponse
 
 from app import summary
-from app.middlewares.validate_requests import JWTAuthenticationMiddleware
+from app.middlewares.validate_requests import JWTAuthenticationASGIMiddleware
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
@@ -14,7 +14,7 @@ ALGORITHM = os.getenv("ALGORITHM")
 summary_app = FastAPI()
 
 summary_app.add_middleware(
-    JWTAuthenticationMiddleware,
+    JWTAuthenticationASGIMiddleware,
     secret_key=SECRET_KEY,
     algorithms=[ALGORITHM]
 )
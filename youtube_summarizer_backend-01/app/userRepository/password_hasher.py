@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor for new hashes; stored hashes below it are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt is CPU-bound, so it runs in its own processes instead of the
+# server's threadpool, where it would hold the GIL against every other request
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Hash/verify calls allowed to wait for a worker before new ones are rejected
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Check a password and rehash it if the stored hash is out of date
+    (lower cost than BCRYPT_ROUNDS or a deprecated scheme).
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches, and the
+        replacement hash when it matches and the stored one needs an update
+    """
+    if not pwd_context.verify(password, hashed_password):
+        return False, None
+    if pwd_context.needs_update(hashed_password):
+        return True, pwd_context.hash(password)
+    return True, None
+
+
+async def ahash_password(password: str) -> str:
+    """
+    Hash a password in the password hashing process pool.
+
+    Raises:
+        PasswordHasherBusy: If PASSWORD_HASH_MAX_QUEUE calls are already waiting
+    """
+    return await _run(hash_password, password)
+
+
+async def averify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Async version of verify_password, run in the password hashing process pool.
+
+    Raises:
+        PasswordHasherBusy: If PASSWORD_HASH_MAX_QUEUE calls are already waiting
+    """
+    return await _run(verify_password, password, hashed_password)
+
+
+async def _run(function, *args):
+    global _pending
+    # Shed load instead of letting a login storm queue up unbounded
+    # latency; the queue is what's left after every worker is busy
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHasherBusy("Password hashing queue is full")
+    _pending += 1
+    try:
+        executor = _get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+        except BrokenProcessPool:
+            # A worker process died (e.g. OOM-killed); replace the pool and try once more
+            logger.warning("Password hashing pool broke, starting a new one")
+            return await asyncio.get_running_loop().run_in_executor(_replace_executor(executor), function, *args)
+    finally:
+        _pending -= 1
+
+
+def _warm() -> None:
+    pass
+
+
+def _new_executor() -> ProcessPoolExecutor:
+    # Spawned, not forked: forking a multithreaded server can copy locks held
+    # by other threads into the child
+    executor = ProcessPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    # Start the workers now rather than on the first sign-in
+    for _ in range(PASSWORD_HASH_WORKERS):
+        executor.submit(_warm)
+    return executor
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = _new_executor()
+        return _executor
+
+
+def _replace_executor(broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        # Concurrent calls that saw the same broken pool share one replacement
+        if _executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _executor = _new_executor()
+        return _executor
+
+
+def start_password_hasher() -> None:
+    """
+    Start the password hashing process pool. Called at app startup, so the
+    pool is not created lazily from a request.
+    """
+    _get_executor()
+
+
+def stop_password_hasher() -> None:
+    """
+    Shut down the password hashing process pool.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,102 @@
+"""
+Throughput benchmark for the /summary JWT middlewares.
+
+Serves a trivial endpoint that reads request.state.user behind the
+BaseHTTPMiddleware-based JWTAuthenticationMiddleware and behind the pure
+ASGI JWTAuthenticationASGIMiddleware, drives each in-process with
+concurrent authenticated requests, and reports requests/sec and latency
+percentiles.
+
+Usage (from the backend root):
+    python -m benchmarks.auth_middleware_benchmark [--requests 5000] [--concurrency 50] [--repeat 3]
+
+Requests go through httpx's ASGI transport, so no network or server
+process is involved and the numbers reflect middleware overhead only.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import httpx
+from fastapi import FastAPI, Request
+from jose import jwt
+
+from app.middlewares.validate_requests import JWTAuthenticationMiddleware, JWTAuthenticationASGIMiddleware
+
+SECRET_KEY = "benchmark-secret"
+ALGORITHM = "HS256"
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware, secret_key=SECRET_KEY, algorithms=[ALGORITHM])
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"sub": request.state.user["sub"]}
+
+    return app
+
+
+async def run_load(app: FastAPI, total: int, concurrency: int, headers: dict) -> Tuple[float, List[float]]:
+    """
+    Send total GET /ping requests with the given concurrency.
+
+    Returns:
+        Tuple[float, List[float]]: Wall time and per-request latencies in seconds
+    """
+    latencies: List[float] = []
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get("/ping", headers=headers)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Unexpected status {response.status_code}: {response.text}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per middleware; the best run is reported")
+    args = parser.parse_args()
+
+    token = jwt.encode(
+        {"sub": "bench", "uid": 1, "exp": datetime.utcnow() + timedelta(hours=1)}, SECRET_KEY, algorithm=ALGORITHM
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    print(f"{args.requests} requests, concurrency {args.concurrency}, best of {args.repeat}")
+
+    print(f"{'middleware':<18}{'req/s':>10}{'p50 (ms)':>11}{'p99 (ms)':>11}")
+    results = {}
+    for name, middleware in (("BaseHTTP", JWTAuthenticationMiddleware), ("pure ASGI", JWTAuthenticationASGIMiddleware)):
+        app = build_app(middleware)
+        asyncio.run(run_load(app, args.concurrency, args.concurrency, headers))  # warm-up
+        elapsed, latencies = min(
+            (asyncio.run(run_load(app, args.requests, args.concurrency, headers)) for _ in range(args.repeat)),
+            key=lambda run: run[0]
+        )
+        results[name] = args.requests / elapsed
+        print(f"{name:<18}{results[name]:>10.0f}{_percentile(latencies, 0.5) * 1000:>11.2f}"
+              f"{_percentile(latencies, 0.99) * 1000:>11.2f}")
+
+    print(f"Speedup: {results['pure ASGI'] / results['BaseHTTP']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
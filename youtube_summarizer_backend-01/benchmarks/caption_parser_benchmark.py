@@ -0,0 +1,142 @@
+"""
+Micro-benchmark for app.summaryRepository.caption_parser.
+
+Parses a YouTube auto-caption VTT file with the streaming parser and with
+the previous list-membership parser, and reports time, line counts and the
+size of the stored cue timings.
+
+Usage (from the backend root):
+    python -m benchmarks.caption_parser_benchmark [--file captions.en.vtt] [--hours 3] [--repeat 3]
+
+Without --file, a rolling auto-caption file of the given length is
+synthesized with the same layout yt-dlp downloads: every cue repeats the
+previous line, carries inline <00:00:01.234><c> word</c> timing tags, and
+is followed by a 10 ms transition cue.
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Any, List
+
+from app.summaryRepository.caption_parser import parse_vtt
+
+WORDS = (
+    "the of and to in is that it for on with as was this at by be are from or have an they "
+    "which you one we all were her would there their will when who him been has more if no out "
+    "so said what up its about into than them can only other new some could time these two may "
+    "first then do any like my now over such our man me even most made after also did many before "
+    "must through back years where much your way well down should because each just those people "
+    "model data training memory kernel cache latency throughput network request token summary"
+).split()
+
+
+def _timestamp(seconds: float) -> str:
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+
+def synthesize_vtt(hours: float, seed: int = 0) -> str:
+    """
+    Build a rolling auto-caption VTT document covering the given duration.
+    """
+    rng = random.Random(seed)
+    parts = ["WEBVTT\nKind: captions\nLanguage: en\n\n"]
+    previous = " "
+    t = 0.0
+    end_of_video = hours * 3600
+    while t < end_of_video:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(4, 9))]
+        duration = rng.uniform(2.0, 4.0)
+        step = duration / len(words)
+        timed = words[0] + "".join(
+            f"<{_timestamp(t + step * i)}><c> {word}</c>" for i, word in enumerate(words[1:], 1)
+        )
+        line = " ".join(words)
+        position = "align:start position:0%"
+        parts.append(f"{_timestamp(t)} --> {_timestamp(t + duration)} {position}\n{previous}\n{timed}\n\n")
+        t += duration
+        parts.append(f"{_timestamp(t)} --> {_timestamp(t + 0.01)} {position}\n{line}\n \n\n")
+        t += 0.01
+        previous = line
+    return "".join(parts)
+
+
+def legacy_parse_vtt_cues(content: str) -> List[List[Any]]:
+    """
+    The previous parser, kept here as the baseline: list membership for
+    de-duplication and no inline timing tag stripping.
+    """
+    def parse_timestamp(timestamp: str) -> float:
+        seconds = 0.0
+        for part in timestamp.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+
+    transcript_lines = []
+    cues = []
+    start, end = 0.0, 0.0
+    for line in content.split('\n'):
+        line = line.strip()
+        if '-->' in line:
+            try:
+                timings = line.split('-->')
+                start = parse_timestamp(timings[0].strip())
+                end = parse_timestamp(timings[1].strip().split(' ')[0])
+            except ValueError:
+                pass
+            continue
+        if line and not line.startswith('WEBVTT') and not line.startswith('NOTE') and not line.isdigit():
+            cleaned_line = line.replace('<c>', '').replace('</c>', '')
+            cleaned_line = cleaned_line.replace('<i>', '').replace('</i>', '')
+            cleaned_line = cleaned_line.replace('<b>', '').replace('</b>', '')
+            if cleaned_line and cleaned_line not in transcript_lines:
+                transcript_lines.append(cleaned_line)
+                cues.append([start, end, cleaned_line])
+    return cues
+
+
+def _best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", help="Recorded VTT caption file (synthesized when omitted)")
+    parser.add_argument("--hours", type=float, default=3.0, help="Length of the synthesized captions")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per parser; the best time is reported")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            content = f.read()
+        source = args.file
+    else:
+        content = synthesize_vtt(args.hours)
+        source = f"synthesized {args.hours:g}h rolling auto-captions"
+
+    print(f"Input: {source} ({len(content) / 1e6:.1f} MB, {content.count(chr(10))} lines)")
+
+    legacy_time, legacy_cues = _best_of(args.repeat, legacy_parse_vtt_cues, content)
+    new_time, captions = _best_of(args.repeat, parse_vtt, content)
+    legacy_text = " ".join(cue[2] for cue in legacy_cues)
+
+    timing_bytes = captions.starts.itemsize * (len(captions.starts) + len(captions.ends))
+    legacy_timing_bytes = sum(sys.getsizeof(cue) + 2 * sys.getsizeof(cue[0]) for cue in legacy_cues)
+
+    print(f"{'parser':<10}{'time (s)':>12}{'lines':>10}{'words':>10}{'timings (KB)':>15}")
+    print(f"{'legacy':<10}{legacy_time:>12.3f}{len(legacy_cues):>10}{len(legacy_text.split()):>10}"
+          f"{legacy_timing_bytes / 1024:>15.0f}")
+    print(f"{'streaming':<10}{new_time:>12.3f}{len(captions):>10}{len(captions.text().split()):>10}"
+          f"{timing_bytes / 1024:>15.0f}")
+    print(f"Speedup: {legacy_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cold-start benchmark for the API and worker entry points.
+
+Imports each module in a fresh interpreter with -X importtime and reports
+the wall time of the import plus the modules that cost the most, both by
+cumulative time (including their own imports) and rolled up per top-level
+package.
+
+Usage (from the backend root):
+    python -m benchmarks.startup_benchmark [--module main --module worker] [--top 15] [--repeat 3]
+
+Nothing is served and no database round trip is expected: importing an
+entry point must not touch the database (schema setup is manage.py init-db).
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = ["main", "worker"]
+
+
+def profile_import(module: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple[float, List[Tuple[str, int, int]]]: Wall time of the import in
+        seconds, and (module, self us, cumulative us) per imported module
+    """
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return float(result.stdout.strip().splitlines()[-1]), timings
+
+
+def by_package(timings: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """
+    Self time summed per top-level package.
+    """
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in timings:
+        totals[name.split(".")[0]] += self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="Entry point to import (default: main and worker)")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules/packages to list")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh imports per module; the fastest is reported")
+    args = parser.parse_args()
+
+    for module in args.module or DEFAULT_MODULES:
+        wall, timings = min((profile_import(module) for _ in range(args.repeat)), key=lambda run: run[0])
+        print(f"\n{module}: {wall * 1000:.0f} ms wall, {len(timings)} modules imported")
+
+        print(f"  {'module':<50}{'cumulative (ms)':>17}{'self (ms)':>11}")
+        for name, self_us, cumulative_us in sorted(timings, key=lambda t: t[2], reverse=True)[:args.top]:
+            print(f"  {name:<50}{cumulative_us / 1000:>17.1f}{self_us / 1000:>11.1f}")
+
+        print(f"  {'package':<50}{'self total (ms)':>17}")
+        packages = sorted(by_package(timings).items(), key=lambda item: item[1], reverse=True)
+        for package, self_us in packages[:args.top]:
+            print(f"  {package:<50}{self_us / 1000:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
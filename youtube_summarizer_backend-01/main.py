@@ -1,27 +1,45 @@
-import uvicorn
-from fastapi import FastAPI, HTTPException
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app import auth_routes
+from app.middlewares.server_timing import ServerTimingMiddleware
+from app.observability import configure_logging
 from app.summary_subapp import summary_app
-from app.userRepository import models
-from app.database import engine
+from app.summaryRepository.models import DEFAULT_SUMMARY_LENGTH
+from app.summaryRepository.summarizer_registry import warm_summarizer
+from app.userRepository.password_hasher import start_password_hasher, stop_password_hasher
 
 
 # Press Shift+F10 to execute it or replace it with your code.
 # Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
 
-models.Base.metadata.create_all(bind=engine)
+configure_logging()
 
 origins = [
     "http://localhost:3000",
     "https://youtube-summarizer-livid.vercel.app"
 ]
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_password_hasher()
+    # LangChain and the tokenizer load on first use; do that off the event loop
+    # now instead of inside the first summary request
+    threading.Thread(target=warm_summarizer, args=(DEFAULT_SUMMARY_LENGTH,), daemon=True).start()
+    yield
+    stop_password_hasher()
+
+
 # Pass middleware to FastAPI
 app = FastAPI(
     title="YouTube Summarizer API",
     description="API for generating video summaries",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -30,14 +48,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+app.add_middleware(ServerTimingMiddleware)
+
 app.include_router(auth_routes.router, prefix="/auth", tags=["auth"])
 
 # Mount the sub-application to the main app
 app.mount("/summary", summary_app)
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Stage latency histograms plus cache, registry and single-flight stats
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 def print_hi(name):
     # Use a breakpoint in the code line below to debug your script.
     print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
@@ -45,6 +72,8 @@ def print_hi(name):
 
 # Press the green button in the gutter to run the script.
 if __name__ == '__main__':
+    import uvicorn
+
     print_hi('FastAPI')
     uvicorn.run(app, host="127.0.0.1", port=8010)
 
@@ -0,0 +1,72 @@
+"""
+Management commands, run from the backend root:
+
+    python manage.py init-db                  Create missing tables and migrate existing ones
+    python manage.py assign-owner USERNAME    Give summaries saved without an owner to USERNAME
+
+Schema setup lives here instead of running on import, so the API and the
+worker start without a database round trip. Run init-db once per deploy,
+before starting them.
+"""
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from app.database import engine
+from app.summaryRepository import models
+from app.userRepository.models import User
+
+
+def init_db() -> None:
+    """
+    Create any missing tables, then bring existing ones up to the current
+    schema with the idempotent steps in models.SCHEMA_MIGRATIONS. Safe to
+    run repeatedly.
+
+    Only schema changes are made; row data is not touched.
+    """
+    models.Base.metadata.create_all(bind=engine)
+    # create_all leaves existing tables as they are (and only fires
+    # after_create for new ones), so columns and indexes added since the
+    # database was created are applied here, in one transaction
+    with engine.begin() as connection:
+        steps = models.migrate_schema(connection)
+        ownerless = models.count_ownerless_summaries(connection)
+    print(f'Tables: {", ".join(sorted(models.Base.metadata.tables))}')
+    print(f'Migration steps checked: {", ".join(steps)}')
+    if ownerless:
+        print(
+            f"{ownerless} saved summaries have no owner (saved before history was per-user) and are not "
+            f"shown to anyone; run 'python manage.py assign-owner USERNAME' to give them to a user",
+            file=sys.stderr
+        )
+
+
+def assign_owner(username: str) -> None:
+    """
+    Give every saved summary without an owner to the user with this username.
+    """
+    with engine.begin() as connection:
+        user_ids = connection.execute(select(User.id).where(User.username == username)).scalars().all()
+        if len(user_ids) != 1:
+            sys.exit(f"Expected one user named {username!r}, found {len(user_ids)}")
+        assigned = models.assign_ownerless_summaries(connection, user_ids[0])
+    print(f"Assigned {assigned} summaries to {username}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("init-db", help="Create missing tables and migrate existing ones").set_defaults(
+        run=lambda args: init_db()
+    )
+    assign = commands.add_parser("assign-owner", help="Give summaries saved without an owner to a user")
+    assign.add_argument("username")
+    assign.set_defaults(run=lambda args: assign_owner(args.username))
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+from app.summaryRepository.caption_parser import parse_json3, parse_vtt
+
+
+def _vtt(*lines: str) -> str:
+    cues = [
+        f"00:00:{i:02d}.000 --> 00:00:{i + 1:02d}.000\n{line}\n"
+        for i, line in enumerate(lines)
+    ]
+    return "WEBVTT\n\n" + "\n".join(cues)
+
+
+def test_word_prefix_is_not_merged_into_longer_word():
+    assert parse_vtt(_vtt("so", "some people say this")).text() == "so some people say this"
+    assert parse_vtt(_vtt("I", "In the end")).text() == "I In the end"
+
+
+def test_growing_line_is_merged():
+    captions = parse_vtt(_vtt("some people", "some people say this"))
+    assert captions.text() == "some people say this"
+    assert captions.cues() == [[0.0, 2.0, "some people say this"]]
+
+
+def test_json3_word_prefix_is_kept():
+    content = {"events": [
+        {"tStartMs": 0, "dDurationMs": 1000, "segs": [{"utf8": "the"}]},
+        {"tStartMs": 1000, "dDurationMs": 1000, "segs": [{"utf8": "there is more"}]},
+    ]}
+    assert parse_json3(content).text() == "the there is more"
@@ -0,0 +1,10 @@
+from app.summaryRepository.search import _MATCH_END, _MATCH_START, _highlight
+
+
+def test_snippet_text_is_escaped_around_matches():
+    snippet = f"<img src=x onerror=alert(1)> about {_MATCH_START}kittens{_MATCH_END} & dogs"
+    assert _highlight(snippet) == "&lt;img src=x onerror=alert(1)&gt; about <mark>kittens</mark> &amp; dogs"
+
+
+def test_stored_mark_tags_are_escaped():
+    assert _highlight("<mark>not a match</mark>") == "&lt;mark&gt;not a match&lt;/mark&gt;"
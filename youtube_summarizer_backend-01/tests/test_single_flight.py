@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.summaryRepository.single_flight import SingleFlight
+
+
+def test_follower_gets_result_when_leader_is_cancelled():
+    async def run():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.1)
+            return 42
+
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        follower = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == 42
+
+
+def test_call_is_cancelled_when_last_waiter_leaves():
+    async def run():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.ado("key", work), 0.01)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return flight.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0
+
+
+def test_hung_call_fails_at_the_deadline():
+    async def run():
+        flight = SingleFlight(timeout=0.01)
+        await flight.ado("key", asyncio.sleep, 10)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+
+from prometheus_client import start_http_server
+
+from app.database import SessionLocal
+from app.observability import collect_stage_timings, configure_logging
+from app.summaryRepository.pipeline import summarize_video
+from app.summaryRepository.repository import claim_next_job, complete_job, fail_job, \
+    requeue_stale_jobs, job_format_type
+
+# Number of jobs one worker process runs at the same time
+SUMMARY_WORKER_CONCURRENCY = int(os.getenv("SUMMARY_WORKER_CONCURRENCY", "4"))
+SUMMARY_WORKER_POLL_SECONDS = float(os.getenv("SUMMARY_WORKER_POLL_SECONDS", "1"))
+SUMMARY_JOB_TIMEOUT_SECONDS = int(os.getenv("SUMMARY_JOB_TIMEOUT_SECONDS", "900"))
+SUMMARY_JOB_MAX_ATTEMPTS = int(os.getenv("SUMMARY_JOB_MAX_ATTEMPTS", "3"))
+# Extra time past the job timeout before a running job counts as abandoned,
+# covering the worker's own timeout handling and clock skew between hosts
+SUMMARY_JOB_STALE_MARGIN_SECONDS = int(os.getenv("SUMMARY_JOB_STALE_MARGIN_SECONDS", "120"))
+SUMMARY_JOB_STALE_SECONDS = SUMMARY_JOB_TIMEOUT_SECONDS + SUMMARY_JOB_STALE_MARGIN_SECONDS
+# Delay before the first retry of a transient failure, doubled on each attempt
+SUMMARY_JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("SUMMARY_JOB_RETRY_BACKOFF_SECONDS", "30"))
+# The pipeline raises ValueError for failures a retry can't fix: an invalid
+# video ID, a video without a transcript, an unusable output budget
+PERMANENT_ERRORS = (ValueError,)
+# Port for this worker's Prometheus /metrics; unset to disable
+SUMMARY_WORKER_METRICS_PORT = os.getenv("SUMMARY_WORKER_METRICS_PORT")
+
+logger = logging.getLogger(__name__)
+
+
+def _with_session(fn, *args, **kwargs):
+    with SessionLocal() as db:
+        return fn(db, *args, **kwargs)
+
+
+async def run_job(job) -> None:
+    """
+    Run the summary pipeline for a claimed job and record the outcome.
+    """
+    logger.info("Running summary job %s (attempt %d): %s", job.id, job.attempts, job.url)
+    try:
+        with collect_stage_timings():
+            response = await asyncio.wait_for(
+                summarize_video(job.url, job_format_type(job), job.max_length, chapters=bool(job.chapters)),
+                timeout=SUMMARY_JOB_TIMEOUT_SECONDS
+            )
+    except Exception as e:
+        retry = not isinstance(e, PERMANENT_ERRORS) and job.attempts < SUMMARY_JOB_MAX_ATTEMPTS
+        delay = SUMMARY_JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        logger.warning(
+            "Summary job %s failed (%s): %s", job.id, f"retrying in {delay:.0f}s" if retry else "giving up", e
+        )
+        recorded = await asyncio.to_thread(
+            _with_session, fail_job, job.id, job.attempts, f"Error summarizing video: {str(e)}", retry, delay
+        )
+    else:
+        recorded = await asyncio.to_thread(_with_session, complete_job, job.id, job.attempts, response.model_dump())
+        if recorded:
+            logger.info("Summary job %s succeeded", job.id)
+
+    if not recorded:
+        logger.warning("Summary job %s attempt %d was reclaimed; dropping its outcome", job.id, job.attempts)
+
+
+async def worker_loop(worker_id: int) -> None:
+    """
+    Claim and run jobs one at a time, polling while the queue is empty.
+    """
+    while True:
+        try:
+            job = await asyncio.to_thread(_with_session, claim_next_job)
+        except Exception as e:
+            logger.warning("Worker %d could not claim a job: %s", worker_id, e)
+            job = None
+
+        if job is None:
+            await asyncio.sleep(SUMMARY_WORKER_POLL_SECONDS)
+            continue
+
+        await run_job(job)
+
+
+async def reaper_loop() -> None:
+    """
+    Periodically requeue jobs whose worker died mid-run.
+    """
+    while True:
+        try:
+            recovered = await asyncio.to_thread(
+                _with_session, requeue_stale_jobs, SUMMARY_JOB_STALE_SECONDS, SUMMARY_JOB_MAX_ATTEMPTS
+            )
+            if recovered:
+                logger.info("Recovered %d stale summary jobs", recovered)
+        except Exception as e:
+            logger.warning("Stale job check failed: %s", e)
+        await asyncio.sleep(SUMMARY_JOB_TIMEOUT_SECONDS / 2)
+
+
+async def main(concurrency: int = SUMMARY_WORKER_CONCURRENCY) -> None:
+    logger.info("Starting summary worker with %d concurrent jobs", concurrency)
+    if SUMMARY_WORKER_METRICS_PORT:
+        start_http_server(int(SUMMARY_WORKER_METRICS_PORT))
+    await asyncio.gather(reaper_loop(), *(worker_loop(i) for i in range(concurrency)))
+
+
+if __name__ == '__main__':
+    configure_logging()
+    asyncio.run(main())